@@ -2,21 +2,56 @@
 Flask API backend for SAM.gov opportunity analysis system
 """
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory
 from flask_cors import CORS
+from flask_compress import Compress
+from werkzeug.routing import BaseConverter, ValidationError
+from bson import ObjectId
+from bson.errors import InvalidId
+from cachetools import TTLCache
+import orjson
 from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from threading import RLock
 import os
+import re
+import time
+import uuid
 import logging
-from database import OpportunityDB
+from database import OpportunityDB, CASE_INSENSITIVE_COLLATION
 from capability_matcher import CapabilityMatcher
 from config_db import MONGODB_CONFIG
-from hubspot_integration import HubSpotClient, HubSpotSyncManager
-from hubspot_config import HubSpotConfigManager
-from hubspot_webhook import register_webhook_endpoint
+from json_provider import OrjsonProvider
+
+class ObjectIdConverter(BaseConverter):
+    """Reject malformed ObjectId route params with a 404 before any DB work"""
+
+    def to_python(self, value):
+        try:
+            ObjectId(value)
+        except (InvalidId, TypeError):
+            raise ValidationError()
+        return value
+
+    def to_url(self, value):
+        return str(value)
+
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+app.url_map.converters['oid'] = ObjectIdConverter
 CORS(app)
 
+# Compress JSON responses - list payloads shrink 5-10x from repeated field names
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 1024
+Compress(app)
+
+# Set ENABLE_HUBSPOT=0 to skip loading the HubSpot stack entirely
+# (faster cold start, no HubSpot routes registered)
+ENABLE_HUBSPOT = os.environ.get('ENABLE_HUBSPOT', '1') == '1'
+
 log = logging.getLogger("app")
 logging.basicConfig(
     level=logging.INFO,
@@ -33,11 +68,17 @@ try:
         db_name=MONGODB_CONFIG["database_name"]
     )
     matcher = CapabilityMatcher(db)
-    config_manager = HubSpotConfigManager(db)
-    
-    # Register webhook endpoint
-    register_webhook_endpoint(app, db, config_manager)
-    
+
+    config_manager = None
+    if ENABLE_HUBSPOT:
+        from hubspot_config import HubSpotConfigManager
+        from hubspot_webhook import register_webhook_endpoint
+
+        config_manager = HubSpotConfigManager(db)
+
+        # Register webhook endpoint
+        register_webhook_endpoint(app, db, config_manager)
+
     log.info("Database connection established successfully")
 except Exception as e:
     log.error(f"Failed to initialize database: {e}")
@@ -45,38 +86,151 @@ except Exception as e:
     exit(1)
 
 
+# Short-lived cache for GET endpoints so dashboards that poll or re-render
+# don't hit MongoDB for identical queries made seconds apart
+_GET_CACHE = TTLCache(maxsize=1024, ttl=45)
+_GET_CACHE_LOCK = RLock()
+
+
+def cached_get(func):
+    """Cache successful GET responses keyed on path + query args
+
+    Only the serialized body/status/mimetype are cached, and every hit
+    builds a fresh Response: after_request hooks (e.g. Flask-Compress)
+    mutate responses in place, so handing one live object to multiple
+    requests would serve the first client's Content-Encoding to all.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (request.path, tuple(sorted(request.args.items())))
+        with _GET_CACHE_LOCK:
+            cached = _GET_CACHE.get(key)
+        if cached is not None:
+            body, status, mimetype = cached
+            return Response(body, status=status, mimetype=mimetype)
+
+        response = func(*args, **kwargs)
+
+        # Only cache plain 200 responses (error tuples carry a status code)
+        if not isinstance(response, tuple) and response.status_code == 200:
+            with _GET_CACHE_LOCK:
+                _GET_CACHE[key] = (response.get_data(),
+                                   response.status_code,
+                                   response.mimetype)
+
+        return response
+    return wrapper
+
+
+def invalidate_get_cache():
+    """Drop cached GET responses after a write"""
+    with _GET_CACHE_LOCK:
+        _GET_CACHE.clear()
+
+
+def _json_response(payload, status=200):
+    """Serialize a response payload with orjson (2-5x faster than jsonify)"""
+    return Response(
+        orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+# Hard cap so a single request can't force an unbounded scan/serialization
+MAX_LIMIT = 500
+
+_NAICS_RE = re.compile(r'^\d{2,6}$')
+
+
+# Fields that may be requested via ?fields= on the list endpoints
+OPP_PROJECTION_WHITELIST = {
+    'title', 'agency', 'posted_date', 'posted_date_parsed', 'due_date',
+    'due_date_parsed', 'type', 'set_aside', 'naics', 'naics_desc', 'url',
+    'status', 'last_updated', 'created_at'
+}
+
+
+def _parse_opp_projection(args):
+    """Build a Mongo projection from ?fields=a,b,c (None returns full documents)"""
+    fields = args.get('fields')
+    if not fields or fields == 'all':
+        return None
+
+    requested = {f.strip() for f in fields.split(',')}
+    projection = {f: 1 for f in requested & OPP_PROJECTION_WHITELIST}
+
+    return projection or None
+
+
+@lru_cache(maxsize=32)
+def _posted_cutoff(days, _second):
+    """Cutoff datetime for a days filter, memoized at 1-second granularity"""
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+def _parse_opp_filters(args):
+    """Parse opportunity list query args once into (filters, collation, limit, skip)"""
+    filters = {}
+    collation = None
+
+    if args.get('naics'):
+        if not _NAICS_RE.match(args.get('naics')):
+            raise ValueError('Invalid naics filter: must be 2-6 digits')
+        filters['naics'] = args.get('naics')
+
+    if args.get('agency'):
+        if len(args.get('agency')) < 2:
+            raise ValueError('Agency filter must be at least 2 characters')
+        if args.get('agency_exact') == '1':
+            # Equality + case-insensitive collation uses the agency index
+            filters['agency'] = args.get('agency')
+            collation = CASE_INSENSITIVE_COLLATION
+        else:
+            # Case-sensitive anchored prefix: Mongo can only serve a
+            # regex from the B-tree index without the 'i' option
+            agency_q = re.escape(args.get('agency'))
+            filters['agency'] = {'$regex': f'^{agency_q}'}
+
+    if args.get('set_aside'):
+        filters['set_aside'] = args.get('set_aside')
+
+    days = args.get('days', type=int)
+    if days is not None:
+        filters['posted_date_parsed'] = {
+            '$gte': _posted_cutoff(days, int(time.time()))
+        }
+
+    limit = max(1, min(args.get('limit', default=100, type=int), MAX_LIMIT))
+    skip = max(args.get('skip', default=0, type=int), 0)
+
+    return filters, collation, limit, skip
+
+
 @app.route('/api/opportunities', methods=['GET'])
+@cached_get
 def get_opportunities():
     """Get opportunities with optional filters"""
     try:
-        filters = {}
-        
-        if request.args.get('naics'):
-            filters['naics'] = request.args.get('naics')
-        
-        if request.args.get('agency'):
-            filters['agency'] = {'$regex': request.args.get('agency'), '$options': 'i'}
-        
-        if request.args.get('set_aside'):
-            filters['set_aside'] = request.args.get('set_aside')
-        
-        if request.args.get('days'):
-            days = int(request.args.get('days'))
-            filters['posted_date_parsed'] = {
-                '$gte': datetime.now(timezone.utc) - timedelta(days=days)
-            }
-        
-        limit = int(request.args.get('limit', 100))
-        skip = int(request.args.get('skip', 0))
-        
-        opportunities = db.get_opportunities(filters, limit, skip)
-        
-        return jsonify({
+        filters, collation, limit, skip = _parse_opp_filters(request.args)
+
+        projection = _parse_opp_projection(request.args)
+
+        opportunities = db.get_opportunities(filters, limit, skip,
+                                             collation=collation, projection=projection)
+
+        return _json_response({
             'success': True,
             'data': opportunities,
             'count': len(opportunities)
         })
-    
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
     except Exception as e:
         log.error(f"Error getting opportunities: {e}")
         return jsonify({
@@ -85,7 +239,7 @@ def get_opportunities():
         }), 500
 
 
-@app.route('/api/opportunities/<opp_id>', methods=['GET'])
+@app.route('/api/opportunities/<oid:opp_id>', methods=['GET'])
 def get_opportunity(opp_id):
     """Get a single opportunity with its matches"""
     try:
@@ -115,7 +269,7 @@ def get_opportunity(opp_id):
         }), 500
 
 
-@app.route('/api/opportunities/<opp_id>/analyze', methods=['POST'])
+@app.route('/api/opportunities/<oid:opp_id>/analyze', methods=['POST'])
 def analyze_opportunity(opp_id):
     """Analyze an opportunity against all active capabilities"""
     try:
@@ -127,8 +281,14 @@ def analyze_opportunity(opp_id):
                 'error': 'Opportunity not found'
             }), 404
         
-        matches = matcher.analyze_opportunity(opportunity)
-        
+        # Serve a cached analysis when the capability set hasn't changed
+        cap_version = db.get_capabilities_version()
+        matches = db.get_cached_matches(opp_id, cap_version)
+
+        if matches is None:
+            matches = matcher.analyze_opportunity(opportunity)
+            db.cache_matches(opp_id, cap_version, matches)
+
         return jsonify({
             'success': True,
             'data': matches
@@ -143,6 +303,7 @@ def analyze_opportunity(opp_id):
 
 
 @app.route('/api/capabilities', methods=['GET'])
+@cached_get
 def get_capabilities():
     """Get all capabilities"""
     try:
@@ -186,7 +347,8 @@ def create_capability():
         }
         
         cap_id = db.create_capability(capability)
-        
+        invalidate_get_cache()
+
         return jsonify({
             'success': True,
             'data': {'id': cap_id}
@@ -200,7 +362,7 @@ def create_capability():
         }), 500
 
 
-@app.route('/api/capabilities/<cap_id>', methods=['PUT'])
+@app.route('/api/capabilities/<oid:cap_id>', methods=['PUT'])
 def update_capability(cap_id):
     """Update a capability"""
     try:
@@ -218,7 +380,8 @@ def update_capability(cap_id):
             }), 400
         
         success = db.update_capability(cap_id, updates)
-        
+        invalidate_get_cache()
+
         return jsonify({
             'success': success
         })
@@ -232,6 +395,7 @@ def update_capability(cap_id):
 
 
 @app.route('/api/matches/high', methods=['GET'])
+@cached_get
 def get_high_matches():
     """Get opportunities with high capability matches"""
     try:
@@ -239,8 +403,8 @@ def get_high_matches():
         limit = int(request.args.get('limit', 50))
         
         matches = db.get_high_matches(threshold, limit)
-        
-        return jsonify({
+
+        return _json_response({
             'success': True,
             'data': matches
         })
@@ -254,6 +418,7 @@ def get_high_matches():
 
 
 @app.route('/api/statistics', methods=['GET'])
+@cached_get
 def get_statistics():
     """Get system statistics"""
     try:
@@ -274,220 +439,273 @@ def get_statistics():
 
 # HubSpot Integration Endpoints
 
-@app.route('/api/hubspot/config', methods=['GET'])
-def get_hubspot_config():
-    """Get HubSpot configuration"""
-    try:
+def _register_hubspot_endpoints():
+    """Register HubSpot routes (only when ENABLE_HUBSPOT is set)"""
+    from hubspot_integration import HubSpotClient, HubSpotSyncManager
+
+    # Cache the client/sync manager across requests; rebuilt only when the
+    # configured credentials change
+    sync_state = {'credentials': None, 'sync_manager': None}
+
+    # Background jobs for sync-from-HubSpot runs
+    sync_executor = ThreadPoolExecutor(max_workers=2)
+    sync_jobs = {}
+
+    def _get_sync_manager():
+        """Get a sync manager for the current config, reusing the cached one"""
         config = config_manager.get_config()
-        
-        if config:
-            # Remove sensitive data from response
-            if 'api_key' in config:
-                config['api_key'] = '***' if config['api_key'] else ''
-            if 'access_token' in config:
-                config['access_token'] = '***' if config['access_token'] else ''
-        
-        return jsonify({
-            'success': True,
-            'data': config or {}
-        })
-    
-    except Exception as e:
-        log.error(f"Error getting HubSpot config: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+        if not config:
+            return None
+
+        credentials = (config.get('api_key'), config.get('access_token'))
+        if sync_state['sync_manager'] is None or sync_state['credentials'] != credentials:
+            client = HubSpotClient(
+                api_key=config.get('api_key'),
+                access_token=config.get('access_token')
+            )
+            sync_state['credentials'] = credentials
+            sync_state['sync_manager'] = HubSpotSyncManager(client, db)
+
+        return sync_state['sync_manager']
+
+    @app.route('/api/hubspot/config', methods=['GET'])
+    def get_hubspot_config():
+        """Get HubSpot configuration"""
+        try:
+            config = config_manager.get_config()
+
+            if config:
+                # Remove sensitive data from response
+                if 'api_key' in config:
+                    config['api_key'] = '***' if config['api_key'] else ''
+                if 'access_token' in config:
+                    config['access_token'] = '***' if config['access_token'] else ''
 
+            return jsonify({
+                'success': True,
+                'data': config or {}
+            })
 
-@app.route('/api/hubspot/config', methods=['POST'])
-def save_hubspot_config():
-    """Save HubSpot configuration"""
-    try:
-        data = request.json
-        
-        # Validate required fields
-        if not data.get('api_key') and not data.get('access_token'):
+        except Exception as e:
+            log.error(f"Error getting HubSpot config: {e}")
             return jsonify({
                 'success': False,
-                'error': 'Either API key or access token is required'
-            }), 400
-        
-        # Save configuration
-        success = config_manager.save_config(data)
-        
-        if success:
-            # Test connection
-            test_result = config_manager.test_connection()
-            
+                'error': str(e)
+            }), 500
+
+
+    @app.route('/api/hubspot/config', methods=['POST'])
+    def save_hubspot_config():
+        """Save HubSpot configuration"""
+        try:
+            data = request.json
+
+            # Validate required fields
+            if not data.get('api_key') and not data.get('access_token'):
+                return jsonify({
+                    'success': False,
+                    'error': 'Either API key or access token is required'
+                }), 400
+
+            # Save configuration
+            success = config_manager.save_config(data)
+            invalidate_get_cache()
+
+            if success:
+                # Test connection
+                test_result = config_manager.test_connection()
+
+                return jsonify({
+                    'success': True,
+                    'message': 'Configuration saved successfully',
+                    'connection_test': test_result
+                })
+            else:
+                return jsonify({
+                    'success': False,
+                    'error': 'Failed to save configuration'
+                }), 500
+
+        except Exception as e:
+            log.error(f"Error saving HubSpot config: {e}")
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+
+
+    @app.route('/api/hubspot/test', methods=['POST'])
+    def test_hubspot_connection():
+        """Test HubSpot connection"""
+        try:
+            result = config_manager.test_connection()
+
+            return jsonify({
+                'success': result['success'],
+                'data': result
+            })
+
+        except Exception as e:
+            log.error(f"Error testing HubSpot connection: {e}")
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+
+
+    @app.route('/api/hubspot/sync', methods=['POST'])
+    def sync_to_hubspot():
+        """Sync opportunities to HubSpot"""
+        try:
+            data = request.json
+            opportunity_ids = data.get('opportunity_ids', [])
+
+            if not opportunity_ids:
+                return jsonify({
+                    'success': False,
+                    'error': 'No opportunities selected for sync'
+                }), 400
+
+            sync_manager = _get_sync_manager()
+            if not sync_manager:
+                return jsonify({
+                    'success': False,
+                    'error': 'HubSpot not configured'
+                }), 400
+
+            # Sync opportunities
+            results = sync_manager.sync_multiple_opportunities(opportunity_ids)
+            invalidate_get_cache()
+
             return jsonify({
                 'success': True,
-                'message': 'Configuration saved successfully',
-                'connection_test': test_result
+                'data': results
             })
-        else:
+
+        except Exception as e:
+            log.error(f"Error syncing to HubSpot: {e}")
             return jsonify({
                 'success': False,
-                'error': 'Failed to save configuration'
+                'error': str(e)
             }), 500
-    
-    except Exception as e:
-        log.error(f"Error saving HubSpot config: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
 
 
-@app.route('/api/hubspot/test', methods=['POST'])
-def test_hubspot_connection():
-    """Test HubSpot connection"""
-    try:
-        result = config_manager.test_connection()
-        
-        return jsonify({
-            'success': result['success'],
-            'data': result
-        })
-    
-    except Exception as e:
-        log.error(f"Error testing HubSpot connection: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    @app.route('/api/hubspot/sync-from', methods=['POST'])
+    def sync_from_hubspot():
+        """Sync deal updates from HubSpot"""
+        try:
+            sync_manager = _get_sync_manager()
+            if not sync_manager:
+                return jsonify({
+                    'success': False,
+                    'error': 'HubSpot not configured'
+                }), 400
 
+            # Run the sync in the background - it can take many seconds
+            # and would otherwise hold a worker for the whole run
+            job_id = uuid.uuid4().hex
+            sync_jobs[job_id] = sync_executor.submit(sync_manager.sync_from_hubspot)
 
-@app.route('/api/hubspot/sync', methods=['POST'])
-def sync_to_hubspot():
-    """Sync opportunities to HubSpot"""
-    try:
-        data = request.json
-        opportunity_ids = data.get('opportunity_ids', [])
-        
-        if not opportunity_ids:
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'status': 'pending'
+            }), 202
+
+        except Exception as e:
+            log.error(f"Error syncing from HubSpot: {e}")
             return jsonify({
                 'success': False,
-                'error': 'No opportunities selected for sync'
-            }), 400
-        
-        # Get HubSpot configuration
-        config = config_manager.get_config()
-        if not config:
+                'error': str(e)
+            }), 500
+
+
+    @app.route('/api/hubspot/sync-from/<job_id>', methods=['GET'])
+    def get_sync_from_status(job_id):
+        """Poll the status of a background sync-from-HubSpot job"""
+        future = sync_jobs.get(job_id)
+
+        if future is None:
             return jsonify({
                 'success': False,
-                'error': 'HubSpot not configured'
-            }), 400
-        
-        # Initialize HubSpot client and sync manager
-        client = HubSpotClient(
-            api_key=config.get('api_key'),
-            access_token=config.get('access_token')
-        )
-        sync_manager = HubSpotSyncManager(client, db)
-        
-        # Sync opportunities
-        results = sync_manager.sync_multiple_opportunities(opportunity_ids)
-        
-        return jsonify({
-            'success': True,
-            'data': results
-        })
-    
-    except Exception as e:
-        log.error(f"Error syncing to HubSpot: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+                'error': 'Job not found'
+            }), 404
 
+        if not future.done():
+            return jsonify({
+                'success': True,
+                'status': 'running'
+            })
 
-@app.route('/api/hubspot/sync-from', methods=['POST'])
-def sync_from_hubspot():
-    """Sync deal updates from HubSpot"""
-    try:
-        # Get HubSpot configuration
-        config = config_manager.get_config()
-        if not config:
+        try:
+            results = future.result()
+        except Exception as e:
+            log.error(f"Background sync from HubSpot failed: {e}")
+            sync_jobs.pop(job_id, None)
             return jsonify({
                 'success': False,
-                'error': 'HubSpot not configured'
-            }), 400
-        
-        # Initialize HubSpot client and sync manager
-        client = HubSpotClient(
-            api_key=config.get('api_key'),
-            access_token=config.get('access_token')
-        )
-        sync_manager = HubSpotSyncManager(client, db)
-        
-        # Sync from HubSpot
-        results = sync_manager.sync_from_hubspot()
-        
+                'status': 'failed',
+                'error': str(e)
+            }), 500
+
+        sync_jobs.pop(job_id, None)
+
         return jsonify({
             'success': results['success'],
+            'status': 'complete',
             'data': results
         })
-    
-    except Exception as e:
-        log.error(f"Error syncing from HubSpot: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
 
 
-@app.route('/api/hubspot/statistics', methods=['GET'])
-def get_hubspot_statistics():
-    """Get HubSpot sync statistics"""
-    try:
-        stats = db.get_hubspot_sync_statistics()
-        
-        return jsonify({
-            'success': True,
-            'data': stats
-        })
-    
-    except Exception as e:
-        log.error(f"Error getting HubSpot statistics: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    @app.route('/api/hubspot/statistics', methods=['GET'])
+    @cached_get
+    def get_hubspot_statistics():
+        """Get HubSpot sync statistics"""
+        try:
+            stats = db.get_hubspot_sync_statistics()
+
+            return jsonify({
+                'success': True,
+                'data': stats
+            })
+
+        except Exception as e:
+            log.error(f"Error getting HubSpot statistics: {e}")
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+
+
+if ENABLE_HUBSPOT:
+    _register_hubspot_endpoints()
+
 
 
 @app.route('/api/opportunities/with-sync', methods=['GET'])
 def get_opportunities_with_sync():
     """Get opportunities with HubSpot sync status"""
     try:
-        filters = {}
-        
-        if request.args.get('naics'):
-            filters['naics'] = request.args.get('naics')
-        
-        if request.args.get('agency'):
-            filters['agency'] = {'$regex': request.args.get('agency'), '$options': 'i'}
-        
-        if request.args.get('set_aside'):
-            filters['set_aside'] = request.args.get('set_aside')
-        
-        if request.args.get('days'):
-            days = int(request.args.get('days'))
-            filters['posted_date_parsed'] = {
-                '$gte': datetime.now(timezone.utc) - timedelta(days=days)
-            }
-        
-        limit = int(request.args.get('limit', 100))
-        skip = int(request.args.get('skip', 0))
-        
-        opportunities = db.get_opportunities_with_sync_status(filters, limit, skip)
-        
-        return jsonify({
+        filters, collation, limit, skip = _parse_opp_filters(request.args)
+
+        projection = _parse_opp_projection(request.args)
+
+        opportunities, total = db.get_opportunities_with_sync_status(filters, limit, skip,
+                                                                     collation=collation, projection=projection)
+
+        return _json_response({
             'success': True,
             'data': opportunities,
-            'count': len(opportunities)
+            'count': len(opportunities),
+            'total': total
         })
     
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
     except Exception as e:
         log.error(f"Error getting opportunities with sync: {e}")
         return jsonify({
@@ -496,24 +714,30 @@ def get_opportunities_with_sync():
         }), 500
 
 
+# The index payload never changes - serialize it once at import time
+_INDEX_BYTES = orjson.dumps({
+    'message': 'SAM.gov Opportunity Analysis API',
+    'endpoints': {
+        'opportunities': '/api/opportunities',
+        'capabilities': '/api/capabilities',
+        'statistics': '/api/statistics',
+        'high_matches': '/api/matches/high',
+        'hubspot_config': '/api/hubspot/config',
+        'hubspot_sync': '/api/hubspot/sync',
+        'hubspot_sync_from': '/api/hubspot/sync-from',
+        'hubspot_statistics': '/api/hubspot/statistics'
+    },
+    'frontend': 'Run separately on port 3000 with: cd frontend && npm start'
+})
+
+
 @app.route('/')
 def index():
     """API root endpoint"""
-    return jsonify({
-        'message': 'SAM.gov Opportunity Analysis API',
-        'endpoints': {
-            'opportunities': '/api/opportunities',
-            'capabilities': '/api/capabilities',
-            'statistics': '/api/statistics',
-            'high_matches': '/api/matches/high',
-            'hubspot_config': '/api/hubspot/config',
-            'hubspot_sync': '/api/hubspot/sync',
-            'hubspot_sync_from': '/api/hubspot/sync-from',
-            'hubspot_statistics': '/api/hubspot/statistics'
-        },
-        'frontend': 'Run separately on port 3000 with: cd frontend && npm start'
-    })
+    return Response(_INDEX_BYTES, mimetype='application/json')
 
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5001, host='127.0.0.1')
\ No newline at end of file
+    # Dev runner only - use gunicorn via wsgi.py in production
+    debug = os.environ.get('FLASK_ENV') == 'development'
+    app.run(debug=debug, port=5001, host='127.0.0.1')
\ No newline at end of file
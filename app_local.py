@@ -9,7 +9,10 @@ import os
 import logging
 import sys
 
+from json_provider import OrjsonProvider
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
 log = logging.getLogger("app")
@@ -173,4 +176,5 @@ if __name__ == '__main__':
     log.info("Starting Flask server on port 5001...")
     log.info("Access the API at: http://localhost:5001")
     log.info("Access the frontend at: http://localhost:3000 (run separately)")
-    app.run(debug=True, port=5001, host='127.0.0.1')
\ No newline at end of file
+    debug = os.environ.get('FLASK_ENV') == 'development'
+    app.run(debug=debug, port=5001, host='127.0.0.1')
\ No newline at end of file
@@ -2,9 +2,11 @@
 Simple Flask app for testing without MongoDB
 """
 
-from flask import Flask, jsonify
+from flask import Flask, Response
 from flask_cors import CORS
+import orjson
 import logging
+import os
 
 app = Flask(__name__)
 CORS(app)
@@ -14,23 +16,29 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# Static payloads - serialize once at import time
+_INDEX_BYTES = orjson.dumps({
+    'status': 'running',
+    'message': 'Flask server is working!',
+    'note': 'This is a test server without MongoDB connection'
+})
+
+_TEST_BYTES = orjson.dumps({
+    'success': True,
+    'data': 'API is responding correctly'
+})
+
 @app.route('/')
 def index():
     """Test endpoint"""
-    return jsonify({
-        'status': 'running',
-        'message': 'Flask server is working!',
-        'note': 'This is a test server without MongoDB connection'
-    })
+    return Response(_INDEX_BYTES, mimetype='application/json')
 
 @app.route('/api/test')
 def test():
     """Test API endpoint"""
-    return jsonify({
-        'success': True,
-        'data': 'API is responding correctly'
-    })
+    return Response(_TEST_BYTES, mimetype='application/json')
 
 if __name__ == '__main__':
     logging.info("Starting simple test server on port 5001...")
-    app.run(debug=True, port=5001, host='127.0.0.1')
\ No newline at end of file
+    debug = os.environ.get('FLASK_ENV') == 'development'
+    app.run(debug=debug, port=5001, host='127.0.0.1')
\ No newline at end of file
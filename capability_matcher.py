@@ -3,20 +3,106 @@ Capability matching system for analyzing opportunities
 """
 
 import re
-from typing import Dict, List, Any
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional
 from database import OpportunityDB
 import logging
 
+try:
+    import ahocorasick
+    _AHOCORASICK_AVAILABLE = True
+except ImportError:
+    _AHOCORASICK_AVAILABLE = False
+
 log = logging.getLogger("capability_matcher")
 
 
 class CapabilityMatcher:
+    # Only the fields scoring actually reads - less BSON shipped and decoded
+    CAPABILITY_PROJECTION = {"keywords": 1, "naics_codes": 1, "preferred_agencies": 1,
+                             "preferred_set_asides": 1, "name": 1}
+    OPPORTUNITY_PROJECTION = {"title": 1, "raw_extra.description": 1,
+                              "raw_data.description": 1, "naics": 1,
+                              "agency": 1, "set_aside": 1}
+
     def __init__(self, db: OpportunityDB):
         self.db = db
-    
-    def calculate_match(self, opportunity: Dict[str, Any], capability: Dict[str, Any]) -> Dict[str, Any]:
+
+    @staticmethod
+    def _build_keyword_automaton(capabilities: List[Dict[str, Any]]):
+        """Build one Aho-Corasick automaton over all capability keywords
+
+        Lets each opportunity's text be scanned once for every keyword of
+        every capability, instead of one substring scan per keyword per
+        capability. Without pyahocorasick, falls back to a single compiled
+        word-boundary regex over all keywords - still one C-engine pass.
+        """
+        words = {}
+        for cap_idx, capability in enumerate(capabilities):
+            for keyword in capability.get('keywords') or []:
+                words.setdefault(keyword.lower(), []).append((cap_idx, keyword))
+
+        if not words:
+            return None
+
+        if _AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for word, entries in words.items():
+                automaton.add_word(word, entries)
+            automaton.make_automaton()
+            return automaton
+
+        # Longest-first alternation so overlapping keywords match the
+        # longer form; the text and keywords are both pre-lowercased
+        pattern = re.compile(
+            r"\b(" + "|".join(re.escape(word) for word in
+                              sorted(words, key=len, reverse=True)) + r")\b"
+        )
+        return (pattern, words)
+
+    @staticmethod
+    def _scan_keywords(automaton, opp_text: str) -> Dict[int, List[str]]:
+        """Scan the text once, returning matched keywords per capability index"""
+        hits = {}
+        if isinstance(automaton, tuple):
+            pattern, words = automaton
+            for word in set(pattern.findall(opp_text)):
+                for cap_idx, keyword in words[word]:
+                    hits.setdefault(cap_idx, set()).add(keyword)
+        else:
+            for _, entries in automaton.iter(opp_text):
+                for cap_idx, keyword in entries:
+                    hits.setdefault(cap_idx, set()).add(keyword)
+
+        return {cap_idx: sorted(keywords) for cap_idx, keywords in hits.items()}
+
+    @staticmethod
+    def _prepare_capabilities(capabilities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach derived scoring fields once per capability
+
+        Saves recomputing them for every opportunity in a batch.
+        """
+        for capability in capabilities:
+            capability['_preferred_agencies_lc'] = [
+                a.lower() for a in capability.get('preferred_agencies') or []
+            ]
+            capability['_naics_set'] = frozenset(capability.get('naics_codes') or ())
+            capability['_set_asides_set'] = frozenset(capability.get('preferred_set_asides') or ())
+        return capabilities
+
+    @staticmethod
+    def _opportunity_text(opportunity: Dict[str, Any]) -> str:
+        """Build the lowercased searchable text for an opportunity once"""
+        # raw_extra on current documents, raw_data on legacy ones
+        raw = opportunity.get('raw_extra') or opportunity.get('raw_data') or {}
+        return f"{opportunity.get('title', '')} {raw.get('description', '')}".lower()
+
+    def calculate_match(self, opportunity: Dict[str, Any], capability: Dict[str, Any],
+                        opp_text: str = None,
+                        matched_keywords: Optional[List[str]] = None) -> Dict[str, Any]:
         """Calculate match percentage between opportunity and capability"""
-        
+
         match_details = {
             'keyword_matches': [],
             'naics_match': False,
@@ -24,42 +110,55 @@ class CapabilityMatcher:
             'value_match': None,
             'set_aside_match': False
         }
-        
+
         score = 0
         max_score = 100
-        
-        opp_text = f"{opportunity.get('title', '')} {opportunity.get('raw_data', {}).get('description', '')}".lower()
+
+        if opp_text is None:
+            opp_text = self._opportunity_text(opportunity)
         
         if capability.get('keywords'):
             keyword_weight = 40
-            matched_keywords = []
-            
-            for keyword in capability['keywords']:
-                if keyword.lower() in opp_text:
-                    matched_keywords.append(keyword)
-            
+
+            if matched_keywords is None:
+                matched_keywords = []
+                for keyword in capability['keywords']:
+                    if keyword.lower() in opp_text:
+                        matched_keywords.append(keyword)
+
             if matched_keywords:
                 match_details['keyword_matches'] = matched_keywords
                 score += keyword_weight * (len(matched_keywords) / len(capability['keywords']))
         
         if capability.get('naics_codes') and opportunity.get('naics'):
             naics_weight = 30
-            if opportunity['naics'] in capability['naics_codes']:
+            naics_set = capability.get('_naics_set')
+            if naics_set is None:
+                naics_set = frozenset(capability['naics_codes'])
+            if opportunity['naics'] in naics_set:
                 match_details['naics_match'] = True
                 score += naics_weight
         
         if capability.get('preferred_agencies') and opportunity.get('agency'):
             agency_weight = 20
-            
-            for preferred_agency in capability['preferred_agencies']:
-                if preferred_agency.lower() in opportunity['agency'].lower():
+
+            agency_lc = opportunity['agency'].lower()
+            preferred_lc = capability.get('_preferred_agencies_lc')
+            if preferred_lc is None:
+                preferred_lc = [a.lower() for a in capability['preferred_agencies']]
+
+            for preferred_agency in preferred_lc:
+                if preferred_agency in agency_lc:
                     match_details['agency_match'] = True
                     score += agency_weight
                     break
         
         if capability.get('preferred_set_asides') and opportunity.get('set_aside'):
             set_aside_weight = 10
-            if opportunity['set_aside'] in capability['preferred_set_asides']:
+            set_asides = capability.get('_set_asides_set')
+            if set_asides is None:
+                set_asides = frozenset(capability['preferred_set_asides'])
+            if opportunity['set_aside'] in set_asides:
                 match_details['set_aside_match'] = True
                 score += set_aside_weight
         
@@ -72,26 +171,57 @@ class CapabilityMatcher:
             'match_details': match_details
         }
     
-    def analyze_opportunity(self, opportunity: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Analyze an opportunity against all active capabilities"""
-        
-        capabilities = self.db.get_capabilities(active_only=True)
+    def analyze_opportunity(self, opportunity: Dict[str, Any],
+                            capabilities: List[Dict[str, Any]] = None,
+                            automaton=None,
+                            match_docs: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """Analyze an opportunity against all active capabilities
+
+        Batch callers can pass the capability list (and its keyword
+        automaton) to avoid re-fetching/rebuilding them per opportunity,
+        and a shared match_docs list to defer match persistence to one
+        bulk insert for the whole batch.
+        """
+
+        if capabilities is None:
+            capabilities = self._prepare_capabilities(
+                self.db.get_capabilities(active_only=True))
+        if automaton is None:
+            automaton = self._build_keyword_automaton(capabilities)
+
         matches = []
-        
-        for capability in capabilities:
-            match = self.calculate_match(opportunity, capability)
+        # Accumulate match docs and insert them in one round trip instead
+        # of one insert_one per matching capability
+        docs = match_docs if match_docs is not None else []
+
+        # Build the searchable text once instead of once per capability
+        opp_text = self._opportunity_text(opportunity)
+
+        # One pass over the text resolves every capability's keywords;
+        # calculate_match falls back to per-keyword scans without the automaton
+        keyword_hits = self._scan_keywords(automaton, opp_text) if automaton else {}
+
+        now = datetime.now(timezone.utc)
+        for cap_idx, capability in enumerate(capabilities):
+            matched_keywords = keyword_hits.get(cap_idx, []) if automaton else None
+            match = self.calculate_match(opportunity, capability, opp_text=opp_text,
+                                         matched_keywords=matched_keywords)
             
             if match['match_percentage'] > 0:
-                self.db.save_match(
+                docs.append(OpportunityDB.build_match_doc(
                     str(opportunity['_id']),
                     str(capability['_id']),
                     match['match_percentage'],
-                    match['match_details']
-                )
+                    match['match_details'],
+                    now=now
+                ))
                 matches.append(match)
-        
+
+        if match_docs is None:
+            self.db.save_matches(docs)
+
         matches.sort(key=lambda x: x['match_percentage'], reverse=True)
-        
+
         return matches
     
     def batch_analyze(self, opportunity_ids: List[str] = None) -> int:
@@ -101,15 +231,86 @@ class CapabilityMatcher:
             opportunities = [self.db.get_opportunity_by_id(oid) for oid in opportunity_ids]
             opportunities = [o for o in opportunities if o]
         else:
-            opportunities = self.db.get_opportunities(limit=1000)
-        
+            opportunities = self.db.get_opportunities(limit=1000,
+                                                      projection=self.OPPORTUNITY_PROJECTION)
+
+        # The capability set doesn't change within a batch - fetch it and
+        # build the keyword automaton once
+        capabilities = self._prepare_capabilities(
+            self.db.get_capabilities(active_only=True,
+                                     projection=self.CAPABILITY_PROJECTION))
+
+        # Scoring is CPU-bound pure Python; large batches are sharded
+        # across processes while all DB writes stay in this one
+        if len(opportunities) >= 50:
+            return self._batch_analyze_parallel(opportunities, capabilities)
+
+        automaton = self._build_keyword_automaton(capabilities)
+
         count = 0
+        match_docs = []
         for opportunity in opportunities:
-            self.analyze_opportunity(opportunity)
+            self.analyze_opportunity(opportunity, capabilities=capabilities,
+                                     automaton=automaton, match_docs=match_docs)
             count += 1
-            
+
+            # Flush accumulated match docs in bulk rather than per match
+            if len(match_docs) >= 1000:
+                self.db.save_matches(match_docs)
+                match_docs = []
+
             if count % 10 == 0:
                 log.info(f"Analyzed {count} opportunities")
-        
+
+        self.db.save_matches(match_docs)
+
         log.info(f"Completed analysis of {count} opportunities")
-        return count
\ No newline at end of file
+        return count
+
+    def _batch_analyze_parallel(self, opportunities: List[Dict[str, Any]],
+                                capabilities: List[Dict[str, Any]]) -> int:
+        """Score opportunities across worker processes
+
+        Each worker builds the keyword automaton once in its initializer;
+        match docs come back to the parent and are flushed in bulk.
+        """
+        count = 0
+        match_docs = []
+        with ProcessPoolExecutor(initializer=_init_scoring_worker,
+                                 initargs=(capabilities,)) as executor:
+            for docs in executor.map(_score_opportunity, opportunities, chunksize=32):
+                match_docs.extend(docs)
+                count += 1
+
+                if len(match_docs) >= 1000:
+                    self.db.save_matches(match_docs)
+                    match_docs = []
+
+                if count % 10 == 0:
+                    log.info(f"Analyzed {count} opportunities")
+
+        self.db.save_matches(match_docs)
+
+        log.info(f"Completed analysis of {count} opportunities")
+        return count
+
+
+# Per-process scoring state for _batch_analyze_parallel; the matcher gets
+# no DB handle because workers only build docs, the parent does the writes
+_worker_matcher = None
+_worker_capabilities = None
+_worker_automaton = None
+
+
+def _init_scoring_worker(capabilities: List[Dict[str, Any]]):
+    global _worker_matcher, _worker_capabilities, _worker_automaton
+    _worker_matcher = CapabilityMatcher(None)
+    _worker_capabilities = capabilities
+    _worker_automaton = CapabilityMatcher._build_keyword_automaton(capabilities)
+
+
+def _score_opportunity(opportunity: Dict[str, Any]) -> List[Dict[str, Any]]:
+    docs = []
+    _worker_matcher.analyze_opportunity(opportunity, capabilities=_worker_capabilities,
+                                        automaton=_worker_automaton, match_docs=docs)
+    return docs
\ No newline at end of file
@@ -8,6 +8,7 @@ import os
 import re
 import tempfile
 
+import orjson
 import six
 from six.moves.urllib.parse import quote
 
@@ -203,8 +204,12 @@ class ApiClient(object):
             return self.__deserialize_file(response)
 
         # fetch data from response object
+        # orjson parses the multi-MB SAM payloads several times faster
+        # than the stdlib and takes the raw bytes without a decode pass;
+        # its JSONDecodeError subclasses ValueError, so the fallback for
+        # non-JSON bodies is unchanged
         try:
-            data = json.loads(response.data)
+            data = orjson.loads(response.data)
         except ValueError:
             data = response.data
 
@@ -3,6 +3,55 @@ Database configuration for MongoDB Atlas
 """
 
 import os
+import tempfile
+
+import orjson
+import yaml
+
+# In-process cache: (mtime, parsed config) per path
+_YAML_CACHE = {}
+
+
+def load_yaml_config(path: str = "config.yaml") -> dict:
+    """Load a YAML config with mtime-keyed caching
+
+    Parsed output is cached in-process and mirrored to a JSON sidecar
+    (<path>.cache.json), so repeat loads skip PyYAML entirely - the
+    pure-Python loader is the slow part. The sidecar regenerates
+    whenever the YAML is newer. Parsing itself prefers the C loader.
+    """
+    mtime = os.stat(path).st_mtime
+
+    cached = _YAML_CACHE.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    sidecar = path + ".cache.json"
+    config = None
+    try:
+        if os.stat(sidecar).st_mtime >= mtime:
+            with open(sidecar, "rb") as f:
+                config = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        pass
+
+    if config is None:
+        with open(path, "r") as f:
+            config = yaml.load(
+                f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+        try:
+            # Atomic sidecar write so a concurrent reader never sees a
+            # partial file
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(path) or ".", suffix=".cache.json.tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(config))
+            os.replace(tmp_path, sidecar)
+        except OSError:
+            pass
+
+    _YAML_CACHE[path] = (mtime, config)
+    return config
 
 # MongoDB Atlas connection configuration
 MONGODB_CONFIG = {
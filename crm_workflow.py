@@ -5,6 +5,7 @@ CRM Workflow System for Opportunity Management
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
 from enum import Enum
+from pymongo import IndexModel
 import logging
 
 log = logging.getLogger("crm_workflow")
@@ -22,6 +23,10 @@ class OpportunityStage(Enum):
     DECLINED = "declined"
 
 
+# Built once; update_stage validates against this on every transition
+_VALID_STAGES = frozenset(s.value for s in OpportunityStage)
+
+
 class CRMWorkflow:
     def __init__(self, db):
         self.db = db
@@ -29,25 +34,32 @@ class CRMWorkflow:
     
     def _ensure_collections(self):
         """Ensure CRM collections exist"""
-        # Create indexes for CRM collections
-        self.db.db.opportunity_tracking.create_index([("opportunity_id", 1)])
-        self.db.db.opportunity_tracking.create_index([("stage", 1)])
-        self.db.db.opportunity_tracking.create_index([("assigned_to", 1)])
-        
-        self.db.db.opportunity_documents.create_index([("opportunity_id", 1)])
-        self.db.db.opportunity_documents.create_index([("document_type", 1)])
-        
-        self.db.db.opportunity_activities.create_index([("opportunity_id", 1)])
-        self.db.db.opportunity_activities.create_index([("activity_date", -1)])
+        # Create indexes for CRM collections - one command per collection
+        self.db.db.opportunity_tracking.create_indexes([
+            IndexModel([("opportunity_id", 1)]),
+            IndexModel([("stage", 1)]),
+            IndexModel([("assigned_to", 1)])
+        ])
+
+        self.db.db.opportunity_documents.create_indexes([
+            IndexModel([("opportunity_id", 1)]),
+            IndexModel([("document_type", 1)])
+        ])
+
+        self.db.db.opportunity_activities.create_indexes([
+            IndexModel([("opportunity_id", 1)]),
+            IndexModel([("activity_date", -1)])
+        ])
     
     def create_opportunity_tracking(self, opportunity_id: str, initial_data: Dict = None) -> str:
         """Create CRM tracking record for an opportunity"""
         
+        now = datetime.now(timezone.utc)
         tracking = {
             "opportunity_id": opportunity_id,
             "stage": OpportunityStage.DISCOVERED.value,
-            "created_at": datetime.now(timezone.utc),
-            "updated_at": datetime.now(timezone.utc),
+            "created_at": now,
+            "updated_at": now,
             "assigned_to": initial_data.get("assigned_to") if initial_data else None,
             "priority": initial_data.get("priority", "medium") if initial_data else "medium",
             "estimated_value": initial_data.get("estimated_value") if initial_data else None,
@@ -58,7 +70,7 @@ class CRMWorkflow:
             "stage_history": [
                 {
                     "stage": OpportunityStage.DISCOVERED.value,
-                    "entered_at": datetime.now(timezone.utc),
+                    "entered_at": now,
                     "entered_by": initial_data.get("entered_by") if initial_data else "system"
                 }
             ]
@@ -86,7 +98,7 @@ class CRMWorkflow:
         """Update opportunity stage"""
         
         # Validate stage
-        if new_stage not in [s.value for s in OpportunityStage]:
+        if new_stage not in _VALID_STAGES:
             raise ValueError(f"Invalid stage: {new_stage}")
         
         # Get current tracking
@@ -98,27 +110,28 @@ class CRMWorkflow:
             tracking = self.db.db.opportunity_tracking.find_one({"opportunity_id": opportunity_id})
         
         old_stage = tracking.get("stage")
-        
+
         # Update stage
+        now = datetime.now(timezone.utc)
         update = {
             "$set": {
                 "stage": new_stage,
-                "updated_at": datetime.now(timezone.utc)
+                "updated_at": now
             },
             "$push": {
                 "stage_history": {
                     "stage": new_stage,
-                    "entered_at": datetime.now(timezone.utc),
+                    "entered_at": now,
                     "entered_by": user,
                     "notes": notes
                 }
             }
         }
-        
+
         if notes:
             update["$push"]["notes"] = {
                 "text": notes,
-                "created_at": datetime.now(timezone.utc),
+                "created_at": now,
                 "created_by": user
             }
         
@@ -228,18 +241,31 @@ class CRMWorkflow:
     
     def get_opportunities_by_stage(self, stage: str) -> List[Dict]:
         """Get all opportunities in a specific stage"""
-        
+
+        # One $lookup pipeline instead of a find_one per tracking record
+        pipeline = [
+            {"$match": {"stage": stage}},
+            {"$addFields": {"opp_oid": {"$toObjectId": "$opportunity_id"}}},
+            {
+                "$lookup": {
+                    "from": "opportunities",
+                    "localField": "opp_oid",
+                    "foreignField": "_id",
+                    "as": "opp"
+                }
+            },
+            {"$unwind": "$opp"}
+        ]
+
         opportunities = []
-        
-        # Get tracking records
-        for tracking in self.db.db.opportunity_tracking.find({"stage": stage}):
-            # Get opportunity details
-            opp = self.db.get_opportunity_by_id(tracking["opportunity_id"])
-            if opp:
-                opp["crm_tracking"] = tracking
-                opp["crm_tracking"]["_id"] = str(tracking["_id"])
-                opportunities.append(opp)
-        
+        for row in self.db.db.opportunity_tracking.aggregate(pipeline):
+            opp = row.pop("opp")
+            opp["_id"] = str(opp["_id"])
+            row.pop("opp_oid", None)
+            row["_id"] = str(row["_id"])
+            opp["crm_tracking"] = row
+            opportunities.append(opp)
+
         return opportunities
     
     def update_opportunity_fields(
@@ -280,26 +306,40 @@ class CRMWorkflow:
     
     def get_pipeline_summary(self) -> Dict[str, Any]:
         """Get summary of opportunities by stage"""
-        
+
+        # One aggregation instead of two queries per stage: counts and value
+        # sums are grouped server-side, with the overall total in the same
+        # round trip via $facet
+        result = next(self.db.db.opportunity_tracking.aggregate([
+            {
+                "$facet": {
+                    "stages": [
+                        {
+                            "$group": {
+                                "_id": "$stage",
+                                "count": {"$sum": 1},
+                                "total_value": {"$sum": {"$ifNull": ["$estimated_value", 0]}}
+                            }
+                        }
+                    ],
+                    "total": [{"$count": "n"}]
+                }
+            }
+        ]))
+
+        by_stage = {row["_id"]: row for row in result["stages"]}
+
         pipeline = []
-        
         for stage in OpportunityStage:
-            count = self.db.db.opportunity_tracking.count_documents({"stage": stage.value})
-            
-            # Calculate total value
-            total_value = 0
-            for tracking in self.db.db.opportunity_tracking.find({"stage": stage.value}):
-                if tracking.get("estimated_value"):
-                    total_value += tracking["estimated_value"]
-            
+            row = by_stage.get(stage.value)
             pipeline.append({
                 "stage": stage.value,
-                "count": count,
-                "total_value": total_value
+                "count": row["count"] if row else 0,
+                "total_value": row["total_value"] if row else 0
             })
-        
+
         return {
             "pipeline": pipeline,
-            "total_opportunities": self.db.db.opportunity_tracking.count_documents({}),
+            "total_opportunities": result["total"][0]["n"] if result["total"] else 0,
             "updated_at": datetime.now(timezone.utc)
         }
\ No newline at end of file
@@ -2,15 +2,79 @@
 Database module for managing SAM.gov opportunities and capabilities
 """
 
+import atexit
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Any
+from bson import ObjectId
+from bson.codec_options import CodecOptions
+from pymongo import IndexModel, MongoClient, ReadPreference, ReturnDocument, UpdateOne, WriteConcern, ASCENDING, DESCENDING
 from pymongo.collection import Collection
 from pymongo.database import Database
 import logging
 
 log = logging.getLogger("database")
 
+# Case-insensitive collation so equality filters on indexed string fields
+# (e.g. agency) can use the index instead of falling back to a regex scan
+CASE_INSENSITIVE_COLLATION = {"locale": "en", "strength": 2}
+
+# Default list projection: the raw SAM payload (raw_extra now, raw_data
+# on legacy documents) dominates document size and list callers don't
+# render it. Pass projection=None for complete documents or an explicit
+# inclusion dict.
+LIST_PROJECTION = {"raw_data": 0, "raw_extra": 0}
+
+
+@lru_cache(maxsize=None)
+def get_opportunity_db(connection_string: str = None, db_name: str = "sam_opportunities") -> "OpportunityDB":
+    """Shared OpportunityDB factory so repeat callers reuse one connection pool"""
+    return OpportunityDB(connection_string=connection_string, db_name=db_name)
+
+
+# One MongoClient per connection string for the whole process; each client
+# owns its own pool, TLS handshakes and heartbeat threads, so constructing
+# one per OpportunityDB instance compounds quickly
+_CLIENT_CACHE: Dict[str, MongoClient] = {}
+
+
+def get_mongo_client(connection_string: str) -> MongoClient:
+    """Shared MongoClient for a connection string
+
+    Importable by scripts (e.g. test_mongodb_atlas.py) so Atlas SRV
+    lookup and the TLS handshake happen once per process, not once per
+    caller. Cached clients are closed by an atexit hook.
+    """
+    return _get_client(connection_string)
+
+
+def _get_client(connection_string: str) -> MongoClient:
+    client = _CLIENT_CACHE.get(connection_string)
+    if client is None:
+        client = MongoClient(
+            connection_string,
+            serverSelectionTimeoutMS=5000,  # 5 second timeout
+            connectTimeoutMS=10000,
+            socketTimeoutMS=10000,
+            maxPoolSize=50,
+            minPoolSize=5,
+            retryWrites=True,
+            # Wire compression - best codec available to the server is used
+            compressors="zstd,snappy,zlib"
+        )
+        _CLIENT_CACHE[connection_string] = client
+    return client
+
+
+def _close_cached_clients():
+    while _CLIENT_CACHE:
+        _, client = _CLIENT_CACHE.popitem()
+        client.close()
+
+
+atexit.register(_close_cached_clients)
+
 
 class OpportunityDB:
     def __init__(self, connection_string: str = None, db_name: str = "sam_opportunities"):
@@ -22,27 +86,52 @@ class OpportunityDB:
         log.info(f"Database: {db_name}")
         
         try:
-            # Add timeout and serverSelectionTimeoutMS
-            self.client = MongoClient(
-                connection_string,
-                serverSelectionTimeoutMS=5000,  # 5 second timeout
-                connectTimeoutMS=10000,
-                socketTimeoutMS=10000
-            )
-            
+            self._connection_string = connection_string
+            self.client = _get_client(connection_string)
+
             # Test the connection
             self.client.admin.command('ping')
             log.info("Successfully connected to MongoDB Atlas")
             
-            self.db: Database = self.client[db_name]
+            # tz-aware codec options so BSON datetimes come back UTC-aware
+            # and callers stop re-attaching tzinfo per document
+            self.db: Database = self.client.get_database(
+                db_name,
+                codec_options=CodecOptions(tz_aware=True)
+            )
             self.opportunities: Collection = self.db.opportunities
+            # Relaxed write concern for the re-runnable ingest path;
+            # singleton updates stay on the journal-safe handle
+            self.opportunities_fast: Collection = self.opportunities.with_options(
+                write_concern=WriteConcern(w=1, j=False)
+            )
             self.capabilities: Collection = self.db.capabilities
             self.matches: Collection = self.db.matches
             self.hubspot_sync: Collection = self.db.hubspot_sync
+            # Webhook/batch sync writes are re-derivable from HubSpot;
+            # skip journal acknowledgement like the opportunity ingest path
+            self.hubspot_sync_fast: Collection = self.hubspot_sync.with_options(
+                write_concern=WriteConcern(w=1, j=False)
+            )
             self.hubspot_config: Collection = self.db.hubspot_config
+            self.sync_jobs: Collection = self.db.sync_jobs
+            self.match_cache: Collection = self.db.match_cache
+
+            # Analytic/list reads tolerate replica lag; route them to a
+            # secondary when one is available so dashboards and match
+            # pages don't compete with ingest on the primary
+            self.opportunities_ro: Collection = self.opportunities.with_options(
+                read_preference=ReadPreference.SECONDARY_PREFERRED)
+            self.matches_ro: Collection = self.matches.with_options(
+                read_preference=ReadPreference.SECONDARY_PREFERRED)
             
+            # Capabilities are small and rarely change; memoize by-id reads
+            # and invalidate on any capability write
+            self._cap_cache: Dict[str, Dict] = {}
+
             log.info("Setting up database indexes...")
             self._setup_indexes()
+            self._migrate_match_oids()
             log.info("Database initialization complete")
             
         except Exception as e:
@@ -51,65 +140,184 @@ class OpportunityDB:
             raise
     
     def _setup_indexes(self):
-        """Create indexes for better query performance"""
-        self.opportunities.create_index([("posted_date", DESCENDING)])
-        self.opportunities.create_index([("due_date", ASCENDING)])
-        self.opportunities.create_index([("naics", ASCENDING)])
-        self.opportunities.create_index([("agency", ASCENDING)])
-        self.opportunities.create_index([("set_aside", ASCENDING)])
-        self.opportunities.create_index([("url", ASCENDING)], unique=True)
-        
-        self.capabilities.create_index([("name", ASCENDING)], unique=True)
-        self.capabilities.create_index([("active", ASCENDING)])
-        
-        self.matches.create_index([("opportunity_id", ASCENDING)])
-        self.matches.create_index([("capability_id", ASCENDING)])
-        self.matches.create_index([("match_percentage", DESCENDING)])
-        self.matches.create_index([("created_at", DESCENDING)])
-        
-        self.hubspot_sync.create_index([("opportunity_id", ASCENDING)], unique=True)
-        self.hubspot_sync.create_index([("hubspot_deal_id", ASCENDING)])
-        self.hubspot_sync.create_index([("sync_status", ASCENDING)])
-        self.hubspot_sync.create_index([("last_sync", DESCENDING)])
+        """Create indexes for better query performance
+
+        One create_indexes command per collection instead of one
+        round trip per index on every startup.
+        """
+        self.opportunities.create_indexes([
+            IndexModel([("posted_date", DESCENDING)]),
+            IndexModel([("due_date", ASCENDING)]),
+            IndexModel([("naics", ASCENDING)]),
+            IndexModel([("agency", ASCENDING)]),
+            IndexModel(
+                [("agency", ASCENDING)],
+                name="agency_ci",
+                collation=CASE_INSENSITIVE_COLLATION
+            ),
+            IndexModel([("set_aside", ASCENDING)]),
+            IndexModel([("url", ASCENDING)], unique=True),
+            # ESR-ordered compounds so filtered + sorted list queries are
+            # served by one index walk
+            IndexModel([("agency", ASCENDING), ("posted_date", DESCENDING)]),
+            IndexModel([("naics", ASCENDING), ("posted_date", DESCENDING)]),
+            # Compound index matching the common list filter (days window + naics/set_aside)
+            IndexModel([
+                ("posted_date_parsed", DESCENDING),
+                ("naics", ASCENDING),
+                ("set_aside", ASCENDING)
+            ])
+        ])
+
+        self.capabilities.create_indexes([
+            IndexModel([("name", ASCENDING)], unique=True),
+            IndexModel([("active", ASCENDING)])
+        ])
+
+        self.matches.create_indexes([
+            # Compound index covers the filter-by-opportunity + sort-by-score
+            # query without an in-memory sort (also serves opportunity_id alone)
+            IndexModel([
+                ("opportunity_id", ASCENDING),
+                ("match_percentage", DESCENDING)
+            ]),
+            IndexModel([("capability_id", ASCENDING)]),
+            IndexModel([("created_at", DESCENDING)]),
+            # Partial index keeps the high-match scan to just the >= 70 slice
+            IndexModel(
+                [("match_percentage", DESCENDING), ("created_at", DESCENDING)],
+                name="high_matches",
+                partialFilterExpression={"match_percentage": {"$gte": 70}}
+            )
+        ])
+
+        self.match_cache.create_indexes([
+            IndexModel(
+                [("opportunity_id", ASCENDING), ("cap_version", ASCENDING)],
+                unique=True
+            ),
+            # Expire cached analyses after 7 days
+            IndexModel([("created_at", ASCENDING)], expireAfterSeconds=7 * 86400)
+        ])
+
+        self.hubspot_sync.create_indexes([
+            IndexModel([("opportunity_id", ASCENDING)], unique=True),
+            IndexModel([("hubspot_deal_id", ASCENDING)]),
+            IndexModel([("sync_status", ASCENDING)]),
+            IndexModel([("last_sync", DESCENDING)])
+        ])
+
+        # Scheduler job history is read newest-first
+        self.sync_jobs.create_indexes([
+            IndexModel([("executed_at", DESCENDING)])
+        ])
+
+    def _migrate_match_oids(self):
+        """Backfill native ObjectId join keys on legacy match docs
+
+        New matches carry opportunity_oid/capability_oid so $lookup hits
+        the _id index directly. Runs once per database: a meta flag set
+        after the backfill lets later startups skip the unindexed
+        $exists scan entirely.
+        """
+        if self.db.meta.find_one({"_id": "match_oid_migration"}):
+            return
+
+        # $convert with onError leaves the key null for a malformed
+        # legacy id instead of aborting the whole update_many
+        self.matches.update_many(
+            {"opportunity_oid": {"$exists": False}},
+            [{"$set": {
+                "opportunity_oid": {"$convert": {
+                    "input": "$opportunity_id", "to": "objectId",
+                    "onError": None
+                }},
+                "capability_oid": {"$convert": {
+                    "input": "$capability_id", "to": "objectId",
+                    "onError": None
+                }}
+            }}]
+        )
+
+        self.db.meta.update_one(
+            {"_id": "match_oid_migration"},
+            {"$set": {"completed_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
     
     def upsert_opportunity(self, opportunity: Dict[str, Any]) -> str:
         """Insert or update an opportunity"""
-        opportunity["last_updated"] = datetime.now(timezone.utc)
-        opportunity["created_at"] = opportunity.get("created_at", datetime.now(timezone.utc))
-        
-        result = self.opportunities.update_one(
+        now = datetime.now(timezone.utc)
+        doc = {k: v for k, v in opportunity.items() if k != "created_at"}
+        doc["last_updated"] = now
+
+        # find_one_and_update returns the _id in the same round trip, and
+        # $setOnInsert keeps created_at from being clobbered on updates
+        result = self.opportunities.find_one_and_update(
             {"url": opportunity["url"]},
-            {"$set": opportunity},
-            upsert=True
+            {"$set": doc, "$setOnInsert": {"created_at": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            projection={"_id": 1}
         )
-        
-        if result.upserted_id:
-            return str(result.upserted_id)
-        else:
-            doc = self.opportunities.find_one({"url": opportunity["url"]})
-            return str(doc["_id"])
+        return str(result["_id"])
     
-    def bulk_upsert_opportunities(self, opportunities: List[Dict[str, Any]]) -> int:
-        """Bulk insert or update opportunities"""
+    def bulk_upsert_opportunities(self, opportunities: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """Bulk insert or update opportunities in one bulk_write per chunk
+
+        Accepts any iterable and chunks it lazily, so streaming producers
+        never materialize the whole batch in memory.
+        """
+        now = datetime.now(timezone.utc)
         count = 0
-        for opp in opportunities:
-            self.upsert_opportunity(opp)
-            count += 1
+
+        it = iter(opportunities)
+        while True:
+            chunk = list(islice(it, chunk_size))
+            if not chunk:
+                break
+
+            ops = []
+            for opp in chunk:
+                doc = {k: v for k, v in opp.items() if k != "created_at"}
+                doc["last_updated"] = now
+                ops.append(UpdateOne(
+                    {"url": opp["url"]},
+                    {"$set": doc, "$setOnInsert": {"created_at": now}},
+                    upsert=True
+                ))
+
+            result = self.opportunities_fast.bulk_write(ops, ordered=False)
+            count += result.upserted_count + result.matched_count
+
         return count
     
-    def get_opportunities(self, filters: Optional[Dict] = None, limit: int = 100, skip: int = 0) -> List[Dict]:
-        """Get opportunities with optional filters"""
+    def get_opportunities(self, filters: Optional[Dict] = None, limit: int = 100, skip: int = 0,
+                          collation: Optional[Dict] = None,
+                          projection: Optional[Dict] = LIST_PROJECTION) -> List[Dict]:
+        """Get opportunities with optional filters
+
+        raw_data is excluded by default; pass projection=None to get
+        complete documents.
+        """
         query = filters or {}
-        
-        cursor = self.opportunities.find(query).sort("posted_date", DESCENDING).skip(skip).limit(limit)
-        
+
+        cursor = self.opportunities_ro.find(query, projection)
+        if collation:
+            cursor = cursor.collation(collation)
+        # Size the first server batch to the page so one getMore fetches
+        # everything instead of the driver's small default batch
+        cursor = (cursor.sort("posted_date", DESCENDING)
+                  .skip(skip).limit(limit)
+                  .batch_size(min(limit, 500)))
+
         opportunities = []
         for doc in cursor:
             doc["_id"] = str(doc["_id"])
             opportunities.append(doc)
-        
+
         return opportunities
-    
+
     def get_opportunity_by_id(self, opp_id: str) -> Optional[Dict]:
         """Get a single opportunity by ID"""
         from bson import ObjectId
@@ -118,32 +326,74 @@ class OpportunityDB:
         if doc:
             doc["_id"] = str(doc["_id"])
         return doc
-    
+
+    def get_opportunities_by_ids(self, opp_ids: List[str]) -> List[Dict]:
+        """Get multiple opportunities in one query"""
+        docs = []
+        for doc in self.opportunities_ro.find(
+                {"_id": {"$in": [ObjectId(opp_id) for opp_id in opp_ids]}}):
+            doc["_id"] = str(doc["_id"])
+            docs.append(doc)
+        return docs
+
     def create_capability(self, capability: Dict[str, Any]) -> str:
         """Create a new capability"""
         capability["created_at"] = datetime.now(timezone.utc)
         capability["active"] = capability.get("active", True)
-        
+
         result = self.capabilities.insert_one(capability)
+        self._cap_cache.clear()
+        self._bump_capabilities_version()
         return str(result.inserted_id)
-    
+
     def update_capability(self, cap_id: str, updates: Dict[str, Any]) -> bool:
         """Update an existing capability"""
         from bson import ObjectId
-        
+
         updates["updated_at"] = datetime.now(timezone.utc)
         result = self.capabilities.update_one(
             {"_id": ObjectId(cap_id)},
             {"$set": updates}
         )
+        self._cap_cache.pop(cap_id, None)
+        self._bump_capabilities_version()
         return result.modified_count > 0
+
+    def _bump_capabilities_version(self):
+        """Bump the capability-set version so cached analyses are invalidated"""
+        self.db.meta.update_one(
+            {"_id": "capabilities_version"},
+            {"$inc": {"version": 1}},
+            upsert=True
+        )
+
+    def get_capabilities_version(self) -> int:
+        """Get the current capability-set version"""
+        doc = self.db.meta.find_one({"_id": "capabilities_version"})
+        return doc["version"] if doc else 0
+
+    def get_cached_matches(self, opportunity_id: str, cap_version: int) -> Optional[List[Dict]]:
+        """Get cached analysis results for an opportunity at a capability version"""
+        doc = self.match_cache.find_one({
+            "opportunity_id": opportunity_id,
+            "cap_version": cap_version
+        })
+        return doc["matches"] if doc else None
+
+    def cache_matches(self, opportunity_id: str, cap_version: int, matches: List[Dict]) -> None:
+        """Store analysis results for reuse while the capability set is unchanged"""
+        self.match_cache.update_one(
+            {"opportunity_id": opportunity_id, "cap_version": cap_version},
+            {"$set": {"matches": matches, "created_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
     
-    def get_capabilities(self, active_only: bool = True) -> List[Dict]:
+    def get_capabilities(self, active_only: bool = True, projection: Optional[Dict] = None) -> List[Dict]:
         """Get all capabilities"""
         query = {"active": True} if active_only else {}
-        
+
         capabilities = []
-        for doc in self.capabilities.find(query):
+        for doc in self.capabilities.find(query, projection):
             doc["_id"] = str(doc["_id"])
             capabilities.append(doc)
         
@@ -152,81 +402,162 @@ class OpportunityDB:
     def get_capability_by_id(self, cap_id: str) -> Optional[Dict]:
         """Get a single capability by ID"""
         from bson import ObjectId
-        
+
+        cached = self._cap_cache.get(cap_id)
+        if cached is not None:
+            return dict(cached)
+
         doc = self.capabilities.find_one({"_id": ObjectId(cap_id)})
         if doc:
             doc["_id"] = str(doc["_id"])
+            self._cap_cache[cap_id] = dict(doc)
         return doc
     
     def save_match(self, opportunity_id: str, capability_id: str, match_percentage: float, match_details: Dict) -> str:
         """Save a match between an opportunity and capability"""
-        match = {
+        result = self.matches.insert_one(
+            self.build_match_doc(opportunity_id, capability_id, match_percentage, match_details))
+        return str(result.inserted_id)
+
+    @staticmethod
+    def build_match_doc(opportunity_id: str, capability_id: str, match_percentage: float,
+                        match_details: Dict, now: Optional[datetime] = None) -> Dict:
+        """Build a match document without writing it, for bulk inserts
+
+        Bulk callers can pass a shared timestamp instead of paying a
+        clock read per document.
+        """
+        return {
             "opportunity_id": opportunity_id,
             "capability_id": capability_id,
+            # Native ObjectIds parsed once at write time so $lookup joins
+            # hit the _id index without per-row $toObjectId coercion
+            "opportunity_oid": ObjectId(opportunity_id),
+            "capability_oid": ObjectId(capability_id),
             "match_percentage": match_percentage,
             "match_details": match_details,
-            "created_at": datetime.now(timezone.utc)
+            "created_at": now or datetime.now(timezone.utc)
         }
-        
-        result = self.matches.insert_one(match)
-        return str(result.inserted_id)
+
+    def save_matches(self, match_docs: List[Dict]) -> int:
+        """Insert many match documents in a single round trip
+
+        Matches are recomputable, so an unacknowledged-journal write
+        concern is fine here.
+        """
+        if not match_docs:
+            return 0
+
+        collection = self.matches.with_options(write_concern=WriteConcern(w=1, j=False))
+        result = collection.insert_many(match_docs, ordered=False)
+        return len(result.inserted_ids)
     
-    def get_matches_for_opportunity(self, opportunity_id: str) -> List[Dict]:
-        """Get all capability matches for an opportunity"""
+    def get_matches_for_opportunity(self, opportunity_id: str,
+                                    include_details: bool = True) -> List[Dict]:
+        """Get all capability matches for an opportunity
+
+        Pass include_details=False to skip the match_details payload when
+        only scores are needed.
+        """
+        pipeline = [
+            {"$match": {"opportunity_id": opportunity_id}},
+            {"$sort": {"match_percentage": -1}},
+        ]
+        if not include_details:
+            pipeline.append({"$project": {"match_details": 0}})
+        pipeline += [
+            {
+                "$lookup": {
+                    "from": "capabilities",
+                    "localField": "capability_oid",
+                    "foreignField": "_id",
+                    "as": "capability"
+                }
+            },
+            {"$unwind": {"path": "$capability", "preserveNullAndEmptyArrays": True}}
+        ]
+
         matches = []
-        for doc in self.matches.find({"opportunity_id": opportunity_id}).sort("match_percentage", DESCENDING):
+        for doc in self.matches_ro.aggregate(pipeline):
             doc["_id"] = str(doc["_id"])
-            
-            capability = self.get_capability_by_id(doc["capability_id"])
-            if capability:
-                doc["capability"] = capability
-            
+            doc.pop("opportunity_oid", None)
+            doc.pop("capability_oid", None)
+            if doc.get("capability"):
+                doc["capability"]["_id"] = str(doc["capability"]["_id"])
+            else:
+                doc.pop("capability", None)
             matches.append(doc)
-        
+
         return matches
-    
+
     def get_high_matches(self, threshold: float = 70.0, limit: int = 50) -> List[Dict]:
         """Get opportunities with high capability matches"""
         pipeline = [
             {"$match": {"match_percentage": {"$gte": threshold}}},
-            {"$sort": {"created_at": -1, "match_percentage": -1}},
-            {"$limit": limit},
+            # Pick the best match per opportunity before limiting, so the
+            # limit doesn't truncate candidates ahead of deduplication
+            {"$sort": {"match_percentage": -1, "created_at": -1}},
             {"$group": {
                 "_id": "$opportunity_id",
                 "best_match": {"$first": "$$ROOT"}
-            }}
+            }},
+            {"$sort": {"best_match.match_percentage": -1}},
+            {"$limit": limit},
+            {"$replaceRoot": {"newRoot": "$best_match"}},
+            {
+                "$lookup": {
+                    "from": "opportunities",
+                    "localField": "opportunity_oid",
+                    "foreignField": "_id",
+                    "as": "opportunity"
+                }
+            },
+            {"$unwind": "$opportunity"},
+            {
+                "$lookup": {
+                    "from": "capabilities",
+                    "localField": "capability_oid",
+                    "foreignField": "_id",
+                    "as": "capability"
+                }
+            },
+            {"$unwind": "$capability"}
         ]
-        
+
         results = []
-        for doc in self.matches.aggregate(pipeline):
-            match = doc["best_match"]
+        for match in self.matches_ro.aggregate(pipeline):
             match["_id"] = str(match["_id"])
-            
-            opportunity = self.get_opportunity_by_id(match["opportunity_id"])
-            capability = self.get_capability_by_id(match["capability_id"])
-            
-            if opportunity and capability:
-                match["opportunity"] = opportunity
-                match["capability"] = capability
-                results.append(match)
-        
+            match.pop("opportunity_oid", None)
+            match.pop("capability_oid", None)
+            match["opportunity"]["_id"] = str(match["opportunity"]["_id"])
+            match["capability"]["_id"] = str(match["capability"]["_id"])
+            results.append(match)
+
         return results
     
     def get_statistics(self) -> Dict:
         """Get database statistics"""
+        # Collection-wide totals come from collection metadata (O(1))
+        # instead of walking the _id index; filtered counts still need
+        # count_documents
         return {
-            "total_opportunities": self.opportunities.count_documents({}),
-            "total_capabilities": self.capabilities.count_documents({}),
+            "total_opportunities": self.opportunities_ro.estimated_document_count(),
+            "total_capabilities": self.capabilities.estimated_document_count(),
             "active_capabilities": self.capabilities.count_documents({"active": True}),
-            "total_matches": self.matches.count_documents({}),
-            "high_matches": self.matches.count_documents({"match_percentage": {"$gte": 70}}),
-            "recent_opportunities": self.opportunities.count_documents({
+            "total_matches": self.matches_ro.estimated_document_count(),
+            "high_matches": self.matches_ro.count_documents({"match_percentage": {"$gte": 70}}),
+            "recent_opportunities": self.opportunities_ro.count_documents({
                 "posted_date": {"$gte": datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)}
             })
         }
     
     def close(self):
-        """Close database connection"""
+        """Close the shared database connection
+
+        The client is shared across every OpportunityDB built from the
+        same connection string, so only call this at process exit.
+        """
+        _CLIENT_CACHE.pop(self._connection_string, None)
         self.client.close()
     
     # HubSpot Integration Methods
@@ -237,7 +568,15 @@ class OpportunityDB:
         if doc:
             doc["_id"] = str(doc["_id"])
         return doc
-    
+
+    def get_hubspot_sync_status_bulk(self, opportunity_ids: List[str]) -> List[Dict]:
+        """Get HubSpot sync status for multiple opportunities in one query"""
+        docs = []
+        for doc in self.hubspot_sync.find({"opportunity_id": {"$in": opportunity_ids}}):
+            doc["_id"] = str(doc["_id"])
+            docs.append(doc)
+        return docs
+
     def update_hubspot_sync_status(self, sync_record: Dict[str, Any]) -> bool:
         """Update HubSpot sync status for an opportunity"""
         sync_record["updated_at"] = datetime.now(timezone.utc)
@@ -249,6 +588,24 @@ class OpportunityDB:
         )
         return result.modified_count > 0 or result.upserted_id is not None
     
+    def watch_hubspot_sync(self) -> Iterable[Dict]:
+        """Yield hubspot_sync documents as they are inserted or updated
+
+        Change-stream push replaces re-polling for consumers that want
+        to react to deal changes landed by the webhook; iterate this on
+        a dedicated thread. Requires a replica set (Atlas qualifies).
+        """
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}
+        ]
+
+        with self.hubspot_sync.watch(pipeline,
+                                     full_document="updateLookup") as stream:
+            for change in stream:
+                doc = change.get("fullDocument")
+                if doc:
+                    yield doc
+
     def get_synced_opportunities(self, filters: Optional[Dict] = None) -> List[Dict]:
         """Get all opportunities that have been synced to HubSpot"""
         query = filters or {}
@@ -260,11 +617,16 @@ class OpportunityDB:
         
         return synced
     
-    def get_opportunities_with_sync_status(self, filters: Optional[Dict] = None, limit: int = 100, skip: int = 0) -> List[Dict]:
-        """Get opportunities with their HubSpot sync status"""
-        pipeline = [
-            {"$match": filters or {}},
-            {"$sort": {"posted_date": -1}},
+    def get_opportunities_with_sync_status(self, filters: Optional[Dict] = None, limit: int = 100, skip: int = 0,
+                                           collation: Optional[Dict] = None,
+                                           projection: Optional[Dict] = None) -> tuple:
+        """Get a page of opportunities with sync status plus the total match count
+
+        Returns:
+            (opportunities, total) - page of documents and the total number
+            of documents matching the filters, from a single round trip
+        """
+        page_stages = [
             {"$skip": skip},
             {"$limit": limit},
             {
@@ -281,22 +643,54 @@ class OpportunityDB:
                 }
             }
         ]
-        
+
+        if projection:
+            page_stages.append({"$project": {**projection, "hubspot_sync": 1}})
+
+        pipeline = [
+            {"$match": filters or {}},
+            {"$sort": {"posted_date": -1}},
+            {
+                "$facet": {
+                    "data": page_stages,
+                    "total": [{"$count": "n"}]
+                }
+            }
+        ]
+
+        aggregate_kwargs = {"collation": collation} if collation else {}
+        result = next(self.opportunities.aggregate(pipeline, **aggregate_kwargs))
+
         opportunities = []
-        for doc in self.opportunities.aggregate(pipeline):
+        for doc in result["data"]:
             doc["_id"] = str(doc["_id"])
             if doc.get("hubspot_sync"):
                 doc["hubspot_sync"]["_id"] = str(doc["hubspot_sync"]["_id"])
             opportunities.append(doc)
-        
-        return opportunities
+
+        total = result["total"][0]["n"] if result["total"] else 0
+
+        return opportunities, total
     
-    def bulk_update_sync_status(self, sync_records: List[Dict[str, Any]]) -> int:
-        """Bulk update HubSpot sync status for multiple opportunities"""
+    def bulk_update_sync_status(self, sync_records: List[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """Bulk update HubSpot sync status in one bulk_write per chunk"""
+        now = datetime.now(timezone.utc)
         count = 0
-        for record in sync_records:
-            if self.update_hubspot_sync_status(record):
-                count += 1
+
+        for start in range(0, len(sync_records), chunk_size):
+            ops = [
+                UpdateOne(
+                    {"opportunity_id": record["opportunity_id"]},
+                    {"$set": {**record, "updated_at": now}},
+                    upsert=True
+                )
+                for record in sync_records[start:start + chunk_size]
+            ]
+
+            if ops:
+                result = self.hubspot_sync_fast.bulk_write(ops, ordered=False)
+                count += result.modified_count + result.upserted_count
+
         return count
     
     def save_hubspot_config(self, config: Dict[str, Any]) -> bool:
@@ -311,6 +705,27 @@ class OpportunityDB:
         )
         return result.modified_count > 0 or result.upserted_id is not None
     
+    def get_hubspot_config_fields(self, fields: List[str]) -> Optional[Dict]:
+        """Get only the named fields of the HubSpot configuration"""
+        doc = self.hubspot_config.find_one(
+            {"_id": "hubspot_config"},
+            {field: 1 for field in fields}
+        )
+        if doc:
+            del doc["_id"]
+        return doc
+
+    def patch_hubspot_config(self, updates: Dict[str, Any]) -> bool:
+        """Merge a partial update into the HubSpot configuration"""
+        updates = {**updates, "updated_at": datetime.now(timezone.utc)}
+
+        result = self.hubspot_config.update_one(
+            {"_id": "hubspot_config"},
+            {"$set": updates},
+            upsert=True
+        )
+        return result.modified_count > 0 or result.upserted_id is not None
+
     def get_hubspot_config(self) -> Optional[Dict]:
         """Get HubSpot configuration"""
         doc = self.hubspot_config.find_one({"_id": "hubspot_config"})
@@ -325,20 +740,32 @@ class OpportunityDB:
     
     def get_hubspot_sync_statistics(self) -> Dict:
         """Get HubSpot sync statistics"""
-        total_synced = self.hubspot_sync.count_documents({})
-        successful = self.hubspot_sync.count_documents({"sync_status": {"$in": ["created", "updated"]}})
-        failed = self.hubspot_sync.count_documents({"sync_status": "error"})
-        
-        # Get last sync time
-        last_sync = self.hubspot_sync.find_one(
-            {},
-            sort=[("last_sync", -1)]
-        )
-        
+        # One $facet aggregation replaces three counts plus a sorted
+        # find_one - four round trips down to one
+        result = next(self.hubspot_sync.aggregate([
+            {
+                "$facet": {
+                    "by_status": [
+                        {"$group": {"_id": "$sync_status", "n": {"$sum": 1}}}
+                    ],
+                    "last": [
+                        {"$sort": {"last_sync": -1}},
+                        {"$limit": 1},
+                        {"$project": {"last_sync": 1}}
+                    ]
+                }
+            }
+        ]))
+
+        by_status = {row["_id"]: row["n"] for row in result["by_status"]}
+        total_synced = sum(by_status.values())
+        successful = by_status.get("created", 0) + by_status.get("updated", 0)
+        failed = by_status.get("error", 0)
+
         return {
             "total_synced": total_synced,
             "successful": successful,
             "failed": failed,
-            "last_sync": last_sync["last_sync"] if last_sync else None,
+            "last_sync": result["last"][0]["last_sync"] if result["last"] else None,
             "sync_percentage": (successful / total_synced * 100) if total_synced > 0 else 0
         }
\ No newline at end of file
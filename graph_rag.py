@@ -3,10 +3,11 @@ GraphRAG implementation using Neo4j for opportunity knowledge graph
 """
 
 import logging
+import re
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import json
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, RoutingControl
 import os
 
 log = logging.getLogger("graph_rag")
@@ -17,119 +18,169 @@ class OpportunityGraphRAG:
         self,
         neo4j_uri: str = "bolt://localhost:7687",
         neo4j_user: str = "neo4j",
-        neo4j_password: str = "password"
+        neo4j_password: str = "password",
+        use_apoc: bool = False
     ):
         self.driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
+        self.use_apoc = use_apoc
+
+        keywords_clause = self._KEYWORDS_APOC if use_apoc else self._KEYWORDS_FOREACH
+        merge = self._OPPORTUNITY_MERGE + keywords_clause
+        self._add_opportunity_cypher = merge.format(p="$")
+        self._add_opportunities_cypher = "UNWIND $batch AS opp" + merge.format(p="opp.")
+
         self._create_constraints()
-    
+        if use_apoc:
+            # One-off vocabulary load for the server-side intersection;
+            # multi-word terms can't match single tokens and are skipped
+            self._write(
+                "UNWIND $terms AS t MERGE (:KeywordVocab {name: t})",
+                {"terms": [t.lower() for t in self.IMPORTANT_TERMS if " " not in t]}
+            )
+
+    # execute_query reuses pooled, bookmarked sessions inside the driver,
+    # so callers skip the per-call session setup of driver.session()
+    def _read(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        records, _, _ = self.driver.execute_query(
+            cypher, params or {}, routing_=RoutingControl.READ)
+        return [dict(record) for record in records]
+
+    def _write(self, cypher: str, params: Optional[Dict[str, Any]] = None):
+        self.driver.execute_query(cypher, params or {}, routing_=RoutingControl.WRITE)
+
     def _create_constraints(self):
         """Create indexes and constraints in Neo4j"""
-        with self.driver.session() as session:
-            # Create constraints
-            constraints = [
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (o:Opportunity) REQUIRE o.id IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (a:Agency) REQUIRE a.name IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (n:NAICS) REQUIRE n.code IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Capability) REQUIRE c.id IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (k:Keyword) REQUIRE k.name IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (d:Document) REQUIRE d.id IS UNIQUE"
-            ]
-            
-            for constraint in constraints:
-                try:
-                    session.run(constraint)
-                except Exception as e:
-                    log.debug(f"Constraint may already exist: {e}")
+        constraints = [
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (o:Opportunity) REQUIRE o.id IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (a:Agency) REQUIRE a.name IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (n:NAICS) REQUIRE n.code IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Capability) REQUIRE c.id IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (k:Keyword) REQUIRE k.name IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (d:Document) REQUIRE d.id IS UNIQUE"
+        ]
+
+        for constraint in constraints:
+            try:
+                self._write(constraint)
+            except Exception as e:
+                log.debug(f"Constraint may already exist: {e}")
     
+    # Common government contracting keywords
+    IMPORTANT_TERMS = [
+        "software", "development", "cloud", "security", "data",
+        "analytics", "AI", "machine learning", "automation",
+        "integration", "modernization", "support", "services",
+        "consulting", "training", "maintenance", "infrastructure"
+    ]
+
+    # One compiled alternation scans the text in a single C-engine pass
+    # instead of one substring scan per term
+    _KW_RE = re.compile(
+        r"\b(" + "|".join(re.escape(t) for t in
+                          sorted(IMPORTANT_TERMS, key=len, reverse=True)) + r")\b",
+        re.IGNORECASE
+    )
+    _TERM_BY_LOWER = {t.lower(): t for t in IMPORTANT_TERMS}
+
+    # Node plus all relationships in one statement - one Bolt round trip
+    # per opportunity instead of one per field/keyword. Optional values
+    # are encoded as empty/one-element lists so FOREACH skips them. The
+    # body is shared between the single ($...) and bulk (opp....) forms.
+    _OPPORTUNITY_MERGE = """
+        MERGE (o:Opportunity {{id: {p}id}})
+        SET o.title = {p}title,
+            o.posted_date = {p}posted_date,
+            o.due_date = {p}due_date,
+            o.type = {p}type,
+            o.set_aside = {p}set_aside,
+            o.url = {p}url,
+            o.description = {p}description
+        FOREACH (aname IN {p}agency |
+            MERGE (a:Agency {{name: aname}})
+            MERGE (o)-[:POSTED_BY]->(a))
+        FOREACH (nc IN {p}naics |
+            MERGE (n:NAICS {{code: nc.code}})
+            SET n.description = nc.desc
+            MERGE (o)-[:CLASSIFIED_AS]->(n))
+    """
+
+    # Default: keywords extracted client-side and linked via FOREACH
+    _KEYWORDS_FOREACH = """
+        FOREACH (kw IN {p}keywords |
+            MERGE (k:Keyword {{name: kw}})
+            MERGE (o)-[:CONTAINS_KEYWORD]->(k))
+    """
+
+    # APOC variant: the raw text is tokenised server-side and intersected
+    # with the pre-loaded :KeywordVocab set, so Python never scans the
+    # text. Single-token vocab terms only.
+    _KEYWORDS_APOC = r"""
+        WITH o, {p}text AS text
+        UNWIND apoc.coll.toSet(apoc.text.split(toLower(text), '\\W+')) AS tok
+        MATCH (:KeywordVocab {{name: tok}})
+        MERGE (k:Keyword {{name: tok}})
+        MERGE (o)-[:CONTAINS_KEYWORD]->(k)
+    """
+
+    def _opportunity_params(self, opportunity: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the parameter dict for the add-opportunity statements"""
+        # Hoist the repeated lookups - these feed several fields each
+        opp_id = opportunity.get("_id") or opportunity.get("url")
+        # raw_extra on current documents, raw_data on legacy ones
+        raw = opportunity.get("raw_extra") or opportunity.get("raw_data") or {}
+        description = raw.get("description", "")
+
+        text = opportunity.get("title", "") + " " + description
+        if self.use_apoc:
+            # Server-side extraction: ship the raw text, skip the regex pass
+            keyword_fields = {"text": text}
+        else:
+            keyword_fields = {"keywords": self._extract_keywords(text)}
+
+        return {
+            **keyword_fields,
+            "id": opp_id,
+            "title": opportunity.get("title"),
+            "posted_date": opportunity.get("posted_date"),
+            "due_date": opportunity.get("due_date"),
+            "type": opportunity.get("type"),
+            "set_aside": opportunity.get("set_aside"),
+            "url": opportunity.get("url"),
+            "description": description[:1000],
+            "agency": [opportunity["agency"]] if opportunity.get("agency") else [],
+            "naics": [{
+                "code": opportunity["naics"],
+                "desc": opportunity.get("naics_desc", "")
+            }] if opportunity.get("naics") else []
+        }
+
     def add_opportunity(self, opportunity: Dict[str, Any]):
         """Add opportunity and its relationships to the graph"""
-        
-        with self.driver.session() as session:
-            # Create opportunity node
-            session.run("""
-                MERGE (o:Opportunity {id: $id})
-                SET o.title = $title,
-                    o.posted_date = $posted_date,
-                    o.due_date = $due_date,
-                    o.type = $type,
-                    o.set_aside = $set_aside,
-                    o.url = $url,
-                    o.description = $description
-            """, {
-                "id": opportunity.get("_id", opportunity.get("url")),
-                "title": opportunity.get("title"),
-                "posted_date": opportunity.get("posted_date"),
-                "due_date": opportunity.get("due_date"),
-                "type": opportunity.get("type"),
-                "set_aside": opportunity.get("set_aside"),
-                "url": opportunity.get("url"),
-                "description": opportunity.get("raw_data", {}).get("description", "")[:1000]
-            })
-            
-            # Create agency relationship
-            if opportunity.get("agency"):
-                session.run("""
-                    MERGE (a:Agency {name: $agency})
-                    WITH a
-                    MATCH (o:Opportunity {id: $opp_id})
-                    MERGE (o)-[:POSTED_BY]->(a)
-                """, {
-                    "agency": opportunity["agency"],
-                    "opp_id": opportunity.get("_id", opportunity.get("url"))
-                })
-            
-            # Create NAICS relationship
-            if opportunity.get("naics"):
-                session.run("""
-                    MERGE (n:NAICS {code: $naics})
-                    SET n.description = $naics_desc
-                    WITH n
-                    MATCH (o:Opportunity {id: $opp_id})
-                    MERGE (o)-[:CLASSIFIED_AS]->(n)
-                """, {
-                    "naics": opportunity["naics"],
-                    "naics_desc": opportunity.get("naics_desc", ""),
-                    "opp_id": opportunity.get("_id", opportunity.get("url"))
-                })
-            
-            # Extract and link keywords from title and description
-            self._extract_keywords(
-                opportunity.get("_id", opportunity.get("url")),
-                opportunity.get("title", "") + " " + 
-                opportunity.get("raw_data", {}).get("description", "")
-            )
-    
-    def _extract_keywords(self, opportunity_id: str, text: str):
-        """Extract keywords from text and create relationships"""
-        
-        # Simple keyword extraction (can be enhanced with NLP)
-        keywords = []
-        
-        # Common government contracting keywords
-        important_terms = [
-            "software", "development", "cloud", "security", "data",
-            "analytics", "AI", "machine learning", "automation",
-            "integration", "modernization", "support", "services",
-            "consulting", "training", "maintenance", "infrastructure"
-        ]
-        
-        text_lower = text.lower()
-        for term in important_terms:
-            if term in text_lower:
-                keywords.append(term)
-        
-        # Create keyword nodes and relationships
-        with self.driver.session() as session:
-            for keyword in keywords:
-                session.run("""
-                    MERGE (k:Keyword {name: $keyword})
-                    WITH k
-                    MATCH (o:Opportunity {id: $opp_id})
-                    MERGE (o)-[:CONTAINS_KEYWORD]->(k)
-                """, {
-                    "keyword": keyword,
-                    "opp_id": opportunity_id
-                })
+
+        self._write(self._add_opportunity_cypher, self._opportunity_params(opportunity))
+
+    def add_opportunities(self, opportunities: List[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """Bulk-add opportunities with one UNWIND statement per chunk
+
+        Keywords are extracted in Python first so the graph side has no
+        branching; transaction commit cost is amortised over the batch.
+        """
+        count = 0
+        for start in range(0, len(opportunities), chunk_size):
+            batch = [self._opportunity_params(o)
+                     for o in opportunities[start:start + chunk_size]]
+            self._write(self._add_opportunities_cypher, {"batch": batch})
+            count += len(batch)
+
+        return count
+
+    def _extract_keywords(self, text: str) -> List[str]:
+        """Extract keywords from text
+
+        Simple keyword extraction (can be enhanced with NLP).
+        """
+        hits = {match.lower() for match in self._KW_RE.findall(text)}
+        return [self._TERM_BY_LOWER[hit] for hit in sorted(hits)]
     
     def add_capability_match(
         self,
@@ -139,31 +190,24 @@ class OpportunityGraphRAG:
     ):
         """Add capability and match relationship to graph"""
         
-        with self.driver.session() as session:
-            # Create capability node
-            session.run("""
-                MERGE (c:Capability {id: $cap_id})
-                SET c.name = $name,
-                    c.description = $description
-            """, {
-                "cap_id": capability.get("_id"),
-                "name": capability.get("name"),
-                "description": capability.get("description", "")
-            })
-            
-            # Create match relationship
-            session.run("""
-                MATCH (o:Opportunity {id: $opp_id})
-                MATCH (c:Capability {id: $cap_id})
-                MERGE (o)-[m:MATCHES]->(c)
-                SET m.score = $score,
-                    m.analyzed_at = $analyzed_at
-            """, {
-                "opp_id": opportunity_id,
-                "cap_id": capability.get("_id"),
-                "score": match_score,
-                "analyzed_at": datetime.utcnow().isoformat()
-            })
+        # Capability node and match relationship in one statement
+        self._write("""
+            MERGE (c:Capability {id: $cap_id})
+            SET c.name = $name,
+                c.description = $description
+            WITH c
+            MATCH (o:Opportunity {id: $opp_id})
+            MERGE (o)-[m:MATCHES]->(c)
+            SET m.score = $score,
+                m.analyzed_at = $analyzed_at
+        """, {
+            "cap_id": capability.get("_id"),
+            "name": capability.get("name"),
+            "description": capability.get("description", ""),
+            "opp_id": opportunity_id,
+            "score": match_score,
+            "analyzed_at": datetime.utcnow().isoformat()
+        })
     
     def add_document(
         self,
@@ -172,22 +216,21 @@ class OpportunityGraphRAG:
     ):
         """Add document node and relationship"""
         
-        with self.driver.session() as session:
-            session.run("""
-                MERGE (d:Document {id: $doc_id})
-                SET d.name = $name,
-                    d.type = $type,
-                    d.url = $url
-                WITH d
-                MATCH (o:Opportunity {id: $opp_id})
-                MERGE (o)-[:HAS_DOCUMENT]->(d)
-            """, {
-                "doc_id": document.get("_id"),
-                "name": document.get("document_name"),
-                "type": document.get("document_type"),
-                "url": document.get("document_url"),
-                "opp_id": opportunity_id
-            })
+        self._write("""
+            MERGE (d:Document {id: $doc_id})
+            SET d.name = $name,
+                d.type = $type,
+                d.url = $url
+            WITH d
+            MATCH (o:Opportunity {id: $opp_id})
+            MERGE (o)-[:HAS_DOCUMENT]->(d)
+        """, {
+            "doc_id": document.get("_id"),
+            "name": document.get("document_name"),
+            "type": document.get("document_type"),
+            "url": document.get("document_url"),
+            "opp_id": opportunity_id
+        })
     
     def find_similar_opportunities(
         self,
@@ -196,79 +239,69 @@ class OpportunityGraphRAG:
     ) -> List[Dict]:
         """Find similar opportunities based on graph relationships"""
         
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (o1:Opportunity {id: $opp_id})
-                MATCH (o1)-[:CONTAINS_KEYWORD]->(k:Keyword)
-                MATCH (o2:Opportunity)-[:CONTAINS_KEYWORD]->(k)
-                WHERE o1 <> o2
-                WITH o2, COUNT(k) as shared_keywords
-                ORDER BY shared_keywords DESC
-                LIMIT $limit
-                RETURN o2.id as id, o2.title as title, 
-                       o2.agency as agency, shared_keywords
-            """, {
-                "opp_id": opportunity_id,
-                "limit": limit
-            })
-            
-            return [dict(record) for record in result]
+        return self._read("""
+            MATCH (o1:Opportunity {id: $opp_id})
+            MATCH (o1)-[:CONTAINS_KEYWORD]->(k:Keyword)
+            MATCH (o2:Opportunity)-[:CONTAINS_KEYWORD]->(k)
+            WHERE o1 <> o2
+            WITH o2, COUNT(k) as shared_keywords
+            ORDER BY shared_keywords DESC
+            LIMIT $limit
+            RETURN o2.id as id, o2.title as title,
+                   o2.agency as agency, shared_keywords
+        """, {
+            "opp_id": opportunity_id,
+            "limit": limit
+        })
     
     def get_agency_opportunities(self, agency_name: str) -> List[Dict]:
         """Get all opportunities from a specific agency"""
         
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (a:Agency {name: $agency})
-                MATCH (o:Opportunity)-[:POSTED_BY]->(a)
-                RETURN o.id as id, o.title as title, 
-                       o.posted_date as posted_date
-                ORDER BY o.posted_date DESC
-            """, {
-                "agency": agency_name
-            })
-            
-            return [dict(record) for record in result]
+        return self._read("""
+            MATCH (a:Agency {name: $agency})
+            MATCH (o:Opportunity)-[:POSTED_BY]->(a)
+            RETURN o.id as id, o.title as title,
+                   o.posted_date as posted_date
+            ORDER BY o.posted_date DESC
+        """, {
+            "agency": agency_name
+        })
     
     def get_opportunity_network(self, opportunity_id: str) -> Dict:
         """Get the network of relationships for an opportunity"""
         
-        with self.driver.session() as session:
-            # Get all relationships
-            result = session.run("""
-                MATCH (o:Opportunity {id: $opp_id})
-                OPTIONAL MATCH (o)-[:POSTED_BY]->(a:Agency)
-                OPTIONAL MATCH (o)-[:CLASSIFIED_AS]->(n:NAICS)
-                OPTIONAL MATCH (o)-[:CONTAINS_KEYWORD]->(k:Keyword)
-                OPTIONAL MATCH (o)-[:MATCHES]->(c:Capability)
-                OPTIONAL MATCH (o)-[:HAS_DOCUMENT]->(d:Document)
-                RETURN o, a, n, 
-                       collect(DISTINCT k.name) as keywords,
-                       collect(DISTINCT c.name) as capabilities,
-                       collect(DISTINCT d.name) as documents
-            """, {
-                "opp_id": opportunity_id
-            })
-            
-            record = result.single()
-            if record:
-                return {
-                    "opportunity": dict(record["o"]),
-                    "agency": dict(record["a"]) if record["a"] else None,
-                    "naics": dict(record["n"]) if record["n"] else None,
-                    "keywords": record["keywords"],
-                    "capabilities": record["capabilities"],
-                    "documents": record["documents"]
-                }
-            
-            return None
+        records = self._read("""
+            MATCH (o:Opportunity {id: $opp_id})
+            OPTIONAL MATCH (o)-[:POSTED_BY]->(a:Agency)
+            OPTIONAL MATCH (o)-[:CLASSIFIED_AS]->(n:NAICS)
+            OPTIONAL MATCH (o)-[:CONTAINS_KEYWORD]->(k:Keyword)
+            OPTIONAL MATCH (o)-[:MATCHES]->(c:Capability)
+            OPTIONAL MATCH (o)-[:HAS_DOCUMENT]->(d:Document)
+            RETURN o, a, n,
+                   collect(DISTINCT k.name) as keywords,
+                   collect(DISTINCT c.name) as capabilities,
+                   collect(DISTINCT d.name) as documents
+        """, {
+            "opp_id": opportunity_id
+        })
+
+        if records:
+            record = records[0]
+            return {
+                "opportunity": dict(record["o"]),
+                "agency": dict(record["a"]) if record["a"] else None,
+                "naics": dict(record["n"]) if record["n"] else None,
+                "keywords": record["keywords"],
+                "capabilities": record["capabilities"],
+                "documents": record["documents"]
+            }
+
+        return None
     
     def query_graph(self, cypher_query: str, parameters: Dict = None) -> List[Dict]:
         """Execute custom Cypher query"""
-        
-        with self.driver.session() as session:
-            result = session.run(cypher_query, parameters or {})
-            return [dict(record) for record in result]
+
+        return self._read(cypher_query, parameters)
     
     def close(self):
         """Close Neo4j connection"""
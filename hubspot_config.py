@@ -5,17 +5,68 @@ HubSpot configuration management module
 import os
 import json
 import logging
+import threading
+import time
+from types import MappingProxyType
 from typing import Dict, Optional, Any
 from datetime import datetime, timezone
 from cryptography.fernet import Fernet
 import base64
 
+# Circular-safe: hubspot_integration does not import this module
+from hubspot_integration import HubSpotClient
+
+# rfernet is a Rust implementation several times faster on the small
+# api-key/token payloads used here; token format is identical. Key
+# generation stays on cryptography's Fernet either way.
+try:
+    from rfernet import Fernet as _FastFernet
+except ImportError:
+    _FastFernet = Fernet
+
 log = logging.getLogger("hubspot_config")
 
+# One Fernet instance per key for the whole process; cipher construction
+# dominates small-payload crypto cost when managers are built per request
+_CIPHER_CACHE: Dict[bytes, Any] = {}
+
+
+# The key file never changes while the process runs; read it once
+# instead of paying the stat+open+read syscalls per manager instance
+_CACHED_KEY: Optional[bytes] = None
+_KEY_LOCK = threading.Lock()
+
+
+def _build_cipher(key: bytes):
+    if _FastFernet is not Fernet:
+        # rfernet takes the key as a string
+        return _FastFernet(key.decode("ascii"))
+    return Fernet(key)
+
 
 class HubSpotConfigManager:
     """Manage HubSpot configuration and credentials"""
-    
+
+    # Fixed attribute set - skip the per-instance __dict__ for managers
+    # constructed per request
+    __slots__ = ("db", "encryption_key", "cipher",
+                 "_config_cache", "_config_cache_ts", "_config_cache_ttl")
+
+    # Built once; get_field_mappings only merges when custom mappings exist
+    _DEFAULT_FIELD_MAPPINGS = MappingProxyType({
+        "title": "dealname",
+        "amount": "amount",
+        "due_date": "closedate",
+        "description": "description",
+        "agency": "sam_agency",
+        "naics": "sam_naics",
+        "set_aside": "sam_set_aside",
+        "notice_id": "sam_notice_id",
+        "url": "sam_url",
+        "posted_date": "sam_posted_date"
+    })
+
+
     def __init__(self, db):
         """
         Initialize configuration manager
@@ -25,41 +76,70 @@ class HubSpotConfigManager:
         """
         self.db = db
         self.encryption_key = self._get_or_create_encryption_key()
-        self.cipher = Fernet(self.encryption_key)
+        cipher = _CIPHER_CACHE.get(self.encryption_key)
+        if cipher is None:
+            cipher = _CIPHER_CACHE.setdefault(self.encryption_key,
+                                              _build_cipher(self.encryption_key))
+        self.cipher = cipher
+        # Decrypted-config cache: get_config is hit by several callers per
+        # request and each call costs a DB round trip plus Fernet decrypts
+        self._config_cache: Optional[Dict[str, Any]] = None
+        self._config_cache_ts = 0.0
+        self._config_cache_ttl = 30.0
     
     def _get_or_create_encryption_key(self) -> bytes:
         """Get or create encryption key for securing API credentials"""
+        global _CACHED_KEY
+
+        if _CACHED_KEY is not None:
+            return _CACHED_KEY
+
         key_file = ".hubspot_key"
-        
-        if os.path.exists(key_file):
-            with open(key_file, 'rb') as f:
-                return f.read()
-        else:
-            key = Fernet.generate_key()
-            with open(key_file, 'wb') as f:
-                f.write(key)
-            # Set restrictive permissions
-            os.chmod(key_file, 0o600)
+
+        with _KEY_LOCK:
+            if _CACHED_KEY is not None:
+                return _CACHED_KEY
+
+            if os.path.exists(key_file):
+                with open(key_file, 'rb') as f:
+                    key = f.read()
+            else:
+                key = Fernet.generate_key()
+                with open(key_file, 'wb') as f:
+                    f.write(key)
+                # Set restrictive permissions
+                os.chmod(key_file, 0o600)
+
+            _CACHED_KEY = key
             return key
     
     def encrypt_value(self, value: str) -> str:
         """Encrypt a sensitive value"""
         if not value:
             return ""
-        encrypted = self.cipher.encrypt(value.encode())
-        return base64.b64encode(encrypted).decode()
-    
+        # Fernet tokens are already URL-safe base64; no second wrapping.
+        # rfernet returns str where cryptography returns bytes
+        token = self.cipher.encrypt(value.encode())
+        return token.decode("ascii") if isinstance(token, bytes) else token
+
     def decrypt_value(self, encrypted_value: str) -> str:
         """Decrypt a sensitive value"""
         if not encrypted_value:
             return ""
         try:
-            decoded = base64.b64decode(encrypted_value.encode())
-            decrypted = self.cipher.decrypt(decoded)
-            return decrypted.decode()
-        except Exception as e:
-            log.error(f"Failed to decrypt value: {e}")
-            return ""
+            return self._decode(self.cipher.decrypt(encrypted_value.encode("ascii")))
+        except Exception:
+            # Legacy values carry an extra base64 layer
+            try:
+                decoded = base64.b64decode(encrypted_value.encode())
+                return self._decode(self.cipher.decrypt(decoded))
+            except Exception as e:
+                log.error(f"Failed to decrypt value: {e}")
+                return ""
+
+    @staticmethod
+    def _decode(plaintext) -> str:
+        return plaintext.decode() if isinstance(plaintext, bytes) else plaintext
     
     def save_config(self, config: Dict[str, Any]) -> bool:
         """
@@ -91,7 +171,8 @@ class HubSpotConfigManager:
             
             # Save to database
             self.db.save_hubspot_config(config)
-            
+            self._invalidate_config_cache()
+
             log.info("HubSpot configuration saved successfully")
             return True
             
@@ -106,24 +187,35 @@ class HubSpotConfigManager:
         Returns:
             Configuration dictionary with decrypted values
         """
+        if (self._config_cache is not None
+                and time.monotonic() - self._config_cache_ts < self._config_cache_ttl):
+            return dict(self._config_cache)
+
         try:
             config = self.db.get_hubspot_config()
-            
+
             if not config:
                 return None
-            
+
             # Decrypt sensitive data
             if "api_key_encrypted" in config:
                 config["api_key"] = self.decrypt_value(config.pop("api_key_encrypted"))
-            
+
             if "access_token_encrypted" in config:
                 config["access_token"] = self.decrypt_value(config.pop("access_token_encrypted"))
-            
+
+            self._config_cache = dict(config)
+            self._config_cache_ts = time.monotonic()
+
             return config
-            
+
         except Exception as e:
             log.error(f"Failed to get HubSpot configuration: {e}")
             return None
+
+    def _invalidate_config_cache(self):
+        self._config_cache = None
+        self._config_cache_ts = 0.0
     
     def update_config(self, updates: Dict[str, Any]) -> bool:
         """
@@ -136,10 +228,19 @@ class HubSpotConfigManager:
             True if updated successfully
         """
         try:
-            current_config = self.get_config() or {}
-            current_config.update(updates)
-            return self.save_config(current_config)
-            
+            # Patch server-side instead of read-decrypt-merge-encrypt-write;
+            # only secrets actually present in the update get re-encrypted
+            updates = dict(updates)
+            if "api_key" in updates:
+                updates["api_key_encrypted"] = self.encrypt_value(updates.pop("api_key"))
+            if "access_token" in updates:
+                updates["access_token_encrypted"] = self.encrypt_value(
+                    updates.pop("access_token"))
+
+            self.db.patch_hubspot_config(updates)
+            self._invalidate_config_cache()
+            return True
+
         except Exception as e:
             log.error(f"Failed to update HubSpot configuration: {e}")
             return False
@@ -153,6 +254,7 @@ class HubSpotConfigManager:
         """
         try:
             self.db.delete_hubspot_config()
+            self._invalidate_config_cache()
             log.info("HubSpot configuration deleted")
             return True
             
@@ -171,18 +273,24 @@ class HubSpotConfigManager:
             Validation result with status and any errors
         """
         if config is None:
-            config = self.get_config()
-        
+            # Validation only needs four fields and the mere presence of a
+            # credential - a projected read skips the decrypt entirely
+            config = self.db.get_hubspot_config_fields([
+                "api_key_encrypted", "access_token_encrypted",
+                "webhook_url", "custom_field_mappings"
+            ])
+
         if not config:
             return {
                 "valid": False,
                 "errors": ["No configuration found"]
             }
-        
+
         errors = []
-        
+
         # Check for required authentication
-        if not config.get("api_key") and not config.get("access_token"):
+        if not (config.get("api_key") or config.get("api_key_encrypted")
+                or config.get("access_token") or config.get("access_token_encrypted")):
             errors.append("Either API key or access token is required")
         
         # Validate webhook URL if provided
@@ -207,27 +315,12 @@ class HubSpotConfigManager:
         Returns:
             Dictionary mapping opportunity fields to HubSpot properties
         """
-        config = self.get_config()
-        
-        # Default mappings
-        default_mappings = {
-            "title": "dealname",
-            "amount": "amount",
-            "due_date": "closedate",
-            "description": "description",
-            "agency": "sam_agency",
-            "naics": "sam_naics",
-            "set_aside": "sam_set_aside",
-            "notice_id": "sam_notice_id",
-            "url": "sam_url",
-            "posted_date": "sam_posted_date"
-        }
-        
-        if config and config.get("custom_field_mappings"):
-            # Override with custom mappings
-            default_mappings.update(config["custom_field_mappings"])
-        
-        return default_mappings
+        custom = (self.get_config() or {}).get("custom_field_mappings")
+
+        if custom:
+            # Override defaults with custom mappings
+            return {**self._DEFAULT_FIELD_MAPPINGS, **custom}
+        return dict(self._DEFAULT_FIELD_MAPPINGS)
     
     def test_connection(self) -> Dict[str, Any]:
         """
@@ -237,8 +330,6 @@ class HubSpotConfigManager:
             Test result with status and details
         """
         try:
-            from hubspot_integration import HubSpotClient
-            
             config = self.get_config()
             if not config:
                 return {
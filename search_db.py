@@ -2,23 +2,23 @@
 Modified search script that stores opportunities in MongoDB
 """
 
+import functools
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
-import yaml
 
 import client
 from client.rest import ApiException
 from database import OpportunityDB
-from config_db import MONGODB_CONFIG
+from config_db import MONGODB_CONFIG, load_yaml_config
 
 log = logging.getLogger("search_db")
 logging.basicConfig(level=logging.INFO)
 
 
 def load_config() -> dict:
-    with open("config.yaml", "r") as file:
-        return yaml.load(file, Loader=yaml.FullLoader)
+    return load_yaml_config("config.yaml")
 
 
 def search(
@@ -46,46 +46,65 @@ def search(
         return []
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_date(date_str: str):
+    """Parse a SAM.gov date string, memoized
+
+    Date strings repeat heavily across a result set (many opportunities
+    share posted/due dates), so each distinct value is parsed once.
+    """
+    # Cheap structural check (YYYY-MM-DD prefix) so obvious junk never
+    # enters the try block
+    if len(date_str) < 10 or date_str[4] != "-" or date_str[7] != "-":
+        return None
+    try:
+        if "T" in date_str:
+            return datetime.fromisoformat(date_str)
+        return datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+# Raw fields kept at the top level of stored documents; everything else
+# moves under raw_extra
+_PROJECTED_FIELDS = frozenset((
+    "title", "agency", "posted_date", "due_date",
+    "type", "set_aside", "naics", "url",
+))
+
+
 def process_opportunity(raw_opp: dict, config: dict) -> dict:
-    """Process raw opportunity data for database storage"""
-    
-    processed = {
-        "title": raw_opp.get("title"),
-        "agency": raw_opp.get("agency"),
-        "posted_date": raw_opp.get("posted_date"),
-        "due_date": raw_opp.get("due_date"),
-        "type": raw_opp.get("type"),
-        "set_aside": raw_opp.get("set_aside"),
-        "naics": raw_opp.get("naics"),
-        "url": raw_opp.get("url"),
-        "raw_data": raw_opp
-    }
-    
-    if processed["posted_date"]:
-        try:
-            if "T" in processed["posted_date"]:
-                processed["posted_date_parsed"] = datetime.fromisoformat(processed["posted_date"])
-            else:
-                processed["posted_date_parsed"] = datetime.strptime(processed["posted_date"], "%Y-%m-%d")
-        except:
-            processed["posted_date_parsed"] = None
-    
-    if processed["due_date"]:
-        try:
-            if "T" in processed["due_date"]:
-                processed["due_date_parsed"] = datetime.fromisoformat(processed["due_date"])
-            else:
-                processed["due_date_parsed"] = datetime.strptime(processed["due_date"], "%Y-%m-%d")
-        except:
-            processed["due_date_parsed"] = None
-    
-    return processed
+    """Process raw opportunity data for database storage
+
+    Mutates and returns raw_opp rather than materializing a second dict
+    per row: the projected fields stay where they are, the remainder
+    moves under raw_extra, so the only allocation is the raw_extra dict.
+    """
+    extra = {}
+    for key in list(raw_opp):
+        if key not in _PROJECTED_FIELDS:
+            extra[key] = raw_opp.pop(key)
+    raw_opp["raw_extra"] = extra
+
+    for key in _PROJECTED_FIELDS:
+        raw_opp.setdefault(key, None)
+
+    if raw_opp["posted_date"]:
+        raw_opp["posted_date_parsed"] = _parse_date(raw_opp["posted_date"])
+
+    if raw_opp["due_date"]:
+        raw_opp["due_date_parsed"] = _parse_date(raw_opp["due_date"])
+
+    return raw_opp
 
 
 def process_search(api_client: client.ApiClient, sam_api_key: str, config: dict, db: OpportunityDB) -> int:
     """Process SAM.gov search and store in database"""
     
-    all_opportunities = []
+    # Keyed on url: one solicitation often matches several NAICS codes,
+    # and duplicates would each become a wasted upsert
+    by_url = {}
+    no_url = []
     limit = 1000
     from_days_back = config["from_days_back"]
     from_date = (date.today() - timedelta(days=from_days_back)).strftime("%m/%d/%Y")
@@ -93,18 +112,29 @@ def process_search(api_client: client.ApiClient, sam_api_key: str, config: dict,
     
     log.info(f"Searching from {from_date} to {to_date}")
     
-    for naics in config["naics"]:
+    def fetch_naics(naics):
         log.info(f"Searching NAICS code: {naics['code']} - {naics['desc']}")
-        
-        naics_results = search(
-            api_client, sam_api_key, from_date, to_date, limit, naics["code"]
+        # Fresh ApiClient per worker - the generated client is not thread-safe
+        worker_client = client.ApiClient(api_client.configuration)
+        return naics, search(
+            worker_client, sam_api_key, from_date, to_date, limit, naics["code"]
         )
-        
-        for result in naics_results:
-            processed = process_opportunity(result, config)
-            processed["naics_desc"] = naics["desc"]
-            all_opportunities.append(processed)
-    
+
+    # The per-NAICS searches are independent network calls; overlap them
+    with ThreadPoolExecutor(max_workers=min(4, len(config["naics"]))) as executor:
+        for naics, naics_results in executor.map(fetch_naics, config["naics"]):
+            for result in naics_results:
+                url = result.get("url")
+                if url in by_url:
+                    continue
+                processed = process_opportunity(result, config)
+                processed["naics_desc"] = naics["desc"]
+                if url:
+                    by_url[url] = processed
+                else:
+                    no_url.append(processed)
+
+    all_opportunities = list(by_url.values()) + no_url
     log.info(f"Found {len(all_opportunities)} total opportunities")
     
     if all_opportunities:
@@ -127,21 +157,19 @@ def main(sam_api_key: str, mongo_url: str = None):
     
     log.info(f"Connecting to MongoDB Atlas database: {db_name}")
     db = OpportunityDB(connection_string=connection_string, db_name=db_name)
-    
-    try:
-        api_config = client.Configuration()
-        api_config.host = config["sam_url"]
-        api_client = client.ApiClient(api_config)
-        
-        log.info("Processing search...")
-        count = process_search(api_client, sam_api_key, config, db)
-        
-        stats = db.get_statistics()
-        log.info(f"Database statistics: {stats}")
-        
-    finally:
-        db.close()
-    
+
+    # No explicit close: the client is shared process-wide and closed by
+    # database's atexit hook, so repeat invocations reuse the pool
+    api_config = client.Configuration()
+    api_config.host = config["sam_url"]
+    api_client = client.ApiClient(api_config)
+
+    log.info("Processing search...")
+    count = process_search(api_client, sam_api_key, config, db)
+
+    stats = db.get_statistics()
+    log.info(f"Database statistics: {stats}")
+
     return count
 
 
@@ -2,60 +2,120 @@
 Opportunity Sync Manager with Throttling and Incremental Updates
 """
 
+import copy
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 import json
-import yaml
 
 import client
 from client.rest import ApiException
+from config_db import load_yaml_config
 from database import OpportunityDB
 
 log = logging.getLogger("sync_manager")
 logging.basicConfig(level=logging.INFO)
 
 
+class _RateLimiter:
+    """Enforce a minimum interval between API calls across threads
+
+    Replaces the old fixed sleeps: callers only wait when they would
+    exceed the rate, not unconditionally after every request.
+    """
+
+    def __init__(self, min_interval: float):
+        self._min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self._min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+
 class SyncManager:
     def __init__(self, db: OpportunityDB, sam_api_key: str):
         self.db = db
         self.sam_api_key = sam_api_key
         self.config = self._load_config()
         self.sync_state = self._load_sync_state()
+        # Snapshot for diffing: _save_sync_state writes only changed keys
+        self._sync_state_baseline = copy.deepcopy(self.sync_state)
+        # ~2 requests/second to SAM.gov, shared by all fetch threads
+        self._rate_limiter = _RateLimiter(0.5)
+        # One ApiClient per thread: the generated client is not
+        # thread-safe, but rebuilding it per call re-allocates its
+        # urllib3 pool manager and drops keep-alive connections
+        self._thread_local = threading.local()
+        # URLs confirmed present in MongoDB (or inserted by us); repeat
+        # incremental runs in one process skip re-probing these, keeping
+        # the $in payload to genuinely unseen URLs
+        self._known_urls = set()
         
+    def _get_api(self) -> "client.SamApi":
+        """Return this thread's SamApi instance, building it on first use"""
+        api = getattr(self._thread_local, "api", None)
+        if api is None:
+            api_config = client.Configuration()
+            api_config.host = self.config["sam_url"]
+            api = client.SamApi(client.ApiClient(api_config))
+            self._thread_local.api = api
+        return api
+
     def _load_config(self) -> dict:
         """Load configuration from config.yaml"""
-        with open("config.yaml", "r") as file:
-            return yaml.load(file, Loader=yaml.FullLoader)
+        return load_yaml_config("config.yaml")
     
     def _load_sync_state(self) -> dict:
         """Load sync state from database or file"""
-        try:
-            # Try to get from database
-            state_doc = self.db.db.sync_state.find_one({"_id": "main"})
-            if state_doc:
-                return state_doc
-        except:
-            pass
-        
-        # Default state
-        return {
+        # Default state; the stored document is merged over it so a
+        # partial document (diffed $set upserts only write changed keys)
+        # can never leave expected keys missing
+        state = {
             "_id": "main",
             "last_sync_date": None,
             "last_opportunity_id": None,
             "total_synced": 0,
             "last_sync_timestamp": None
         }
+
+        try:
+            # Try to get from database
+            state_doc = self.db.db.sync_state.find_one({"_id": "main"})
+            if state_doc:
+                state.update(state_doc)
+        except:
+            pass
+
+        return state
     
     def _save_sync_state(self):
-        """Save sync state to database"""
+        """Save sync state to database
+
+        Incremental checkpoint: only keys that changed since the last
+        save are written, so the document is not re-transferred wholesale
+        every cycle as it grows.
+        """
         self.sync_state["last_sync_timestamp"] = datetime.now(timezone.utc)
-        self.db.db.sync_state.replace_one(
-            {"_id": "main"},
-            self.sync_state,
-            upsert=True
-        )
+        changes = {
+            k: v for k, v in self.sync_state.items()
+            if v != self._sync_state_baseline.get(k)
+        }
+        if changes:
+            self.db.db.sync_state.update_one(
+                {"_id": "main"},
+                {"$set": changes},
+                upsert=True
+            )
+            self._sync_state_baseline = copy.deepcopy(self.sync_state)
     
     def search_opportunities(
         self,
@@ -66,12 +126,11 @@ class SyncManager:
         offset: int = 0
     ) -> List[Dict]:
         """Search opportunities with pagination support"""
-        
-        api_config = client.Configuration()
-        api_config.host = self.config["sam_url"]
-        api_client = client.ApiClient(api_config)
-        api_instance = client.SamApi(api_client)
-        
+
+        api_instance = self._get_api()
+
+        self._rate_limiter.wait()
+
         try:
             # Add offset parameter for pagination
             api_response = api_instance.search(
@@ -117,27 +176,47 @@ class SyncManager:
         
         all_new_opportunities = []
         opportunities_per_naics = max_opportunities // len(self.config["naics"])
-        
-        for naics in self.config["naics"]:
+
+        def fetch_naics(naics):
             log.info(f"Fetching NAICS {naics['code']}: {naics['desc']}")
-            
-            opportunities = self.search_opportunities(
+            return naics, self.search_opportunities(
                 from_date_str,
                 to_date_str,
                 naics["code"],
                 limit=opportunities_per_naics
             )
-            
+
+        # The per-NAICS searches are independent, latency-bound calls;
+        # overlap them on a few threads. The small pool keeps concurrent
+        # load on SAM.gov modest, replacing the old fixed 2s sleeps.
+        with ThreadPoolExecutor(
+                max_workers=min(4, len(self.config["naics"]))) as executor:
+            fetched = list(executor.map(fetch_naics, self.config["naics"]))
+
+        # One $in query answers "which of these do we already have" for
+        # the whole run instead of a find_one per opportunity; the unique
+        # url index serves it with an index scan. URLs already confirmed
+        # known in this process are filtered out first, so the probe only
+        # carries genuinely unseen URLs
+        urls = [opp.get("url")
+                for _, opportunities in fetched
+                for opp in opportunities
+                if opp.get("url") and opp["url"] not in self._known_urls]
+        if urls:
+            self._known_urls.update(
+                doc["url"] for doc in self.db.opportunities.find(
+                    {"url": {"$in": urls}}, {"url": 1, "_id": 0})
+            )
+
+        fetched_at = datetime.now(timezone.utc)
+        for naics, opportunities in fetched:
             for opp in opportunities:
-                # Check if we already have this opportunity
-                existing = self.db.opportunities.find_one({"url": opp.get("url")})
-                if not existing:
+                if opp.get("url") not in self._known_urls:
                     opp["naics_desc"] = naics["desc"]
-                    opp["fetched_at"] = datetime.now(timezone.utc)
+                    opp["fetched_at"] = fetched_at
                     all_new_opportunities.append(opp)
-            
-            # Throttle between NAICS searches (2 seconds)
-            time.sleep(2)
+                    if opp.get("url"):
+                        self._known_urls.add(opp["url"])
         
         # Store new opportunities
         if all_new_opportunities:
@@ -170,15 +249,13 @@ class SyncManager:
         from_date_str = from_date.strftime("%m/%d/%Y")
         to_date_str = to_date.strftime("%m/%d/%Y")
         
-        total_synced = 0
-        
-        for naics in self.config["naics"]:
+        def sync_naics(naics):
             offset = 0
-            naics_total = 0
-            
+            accumulated = []
+
             while True:
                 log.info(f"Fetching NAICS {naics['code']}, offset {offset}")
-                
+
                 opportunities = self.search_opportunities(
                     from_date_str,
                     to_date_str,
@@ -186,28 +263,36 @@ class SyncManager:
                     limit=batch_size,
                     offset=offset
                 )
-                
+
                 if not opportunities:
                     break
-                
-                # Process and store
+
+                fetched_at = datetime.now(timezone.utc)
                 for opp in opportunities:
                     opp["naics_desc"] = naics["desc"]
-                    opp["fetched_at"] = datetime.now(timezone.utc)
-                
-                count = self.db.bulk_upsert_opportunities(opportunities)
-                naics_total += count
+                    opp["fetched_at"] = fetched_at
+
+                accumulated.extend(opportunities)
                 offset += batch_size
-                
-                # Throttle (3 seconds between batches)
-                time.sleep(3)
-                
+
                 # Stop if we've hit our limit for this run
-                if naics_total >= batch_size * 3:
+                if len(accumulated) >= batch_size * 3:
                     log.info(f"Reached batch limit for NAICS {naics['code']}")
                     break
-            
-            total_synced += naics_total
+
+            # One upsert flush per NAICS instead of one per page;
+            # bulk_upsert_opportunities chunks internally to stay under
+            # the bulk_write message limit
+            if accumulated:
+                return self.db.bulk_upsert_opportunities(accumulated)
+            return 0
+
+        # Pagination within a NAICS stays sequential (offsets depend on
+        # order) but different NAICS codes page independently; the shared
+        # rate limiter keeps the combined request rate in bounds
+        with ThreadPoolExecutor(
+                max_workers=min(4, len(self.config["naics"]))) as executor:
+            total_synced = sum(executor.map(sync_naics, self.config["naics"]))
         
         # Update sync state
         self.sync_state["last_sync_date"] = to_date.isoformat()
@@ -3,12 +3,18 @@ Test backend API endpoints
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from config_db import MONGODB_CONFIG
 
 def test_api():
     base_url = "http://localhost:5000"
-    
+
+    # One keep-alive session for all four calls instead of a fresh
+    # connection per request
+    s = requests.Session()
+    s.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
     print("Testing Backend API")
     print("===================")
     print()
@@ -16,7 +22,7 @@ def test_api():
     # Test root endpoint
     try:
         print("1. Testing root endpoint (/)...")
-        response = requests.get(f"{base_url}/", timeout=5)
+        response = s.get(f"{base_url}/", timeout=5)
         if response.status_code == 200:
             print("   ✅ Root endpoint is working")
             print(f"   Response: {json.dumps(response.json(), indent=2)}")
@@ -32,7 +38,7 @@ def test_api():
     # Test statistics endpoint
     try:
         print("2. Testing statistics endpoint (/api/statistics)...")
-        response = requests.get(f"{base_url}/api/statistics", timeout=10)
+        response = s.get(f"{base_url}/api/statistics", timeout=10)
         if response.status_code == 200:
             print("   ✅ Statistics endpoint is working")
             data = response.json()
@@ -55,7 +61,13 @@ def test_api():
     # Test opportunities endpoint
     try:
         print("3. Testing opportunities endpoint (/api/opportunities)...")
-        response = requests.get(f"{base_url}/api/opportunities?limit=1", timeout=10)
+        # fields= keeps the probe to a projected response instead of
+        # pulling full documents with the embedded raw payload
+        response = s.get(
+            f"{base_url}/api/opportunities"
+            "?limit=1&fields=title,agency,posted_date,url",
+            timeout=10
+        )
         if response.status_code == 200:
             print("   ✅ Opportunities endpoint is working")
             data = response.json()
@@ -74,7 +86,7 @@ def test_api():
     # Test capabilities endpoint
     try:
         print("4. Testing capabilities endpoint (/api/capabilities)...")
-        response = requests.get(f"{base_url}/api/capabilities", timeout=10)
+        response = s.get(f"{base_url}/api/capabilities", timeout=10)
         if response.status_code == 200:
             print("   ✅ Capabilities endpoint is working")
             data = response.json()
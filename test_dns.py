@@ -2,9 +2,26 @@
 Test DNS resolution for MongoDB Atlas
 """
 
+import functools
 import socket
 import dns.resolver
 
+# Module-level resolver with an answer cache: repeat probes within a
+# process reuse cached answers instead of new UDP round trips
+_resolver = dns.resolver.Resolver()
+_resolver.lifetime = 3.0
+_resolver.cache = dns.resolver.LRUCache(100)
+
+
+@functools.lru_cache(maxsize=16)
+def _resolve_srv(host: str):
+    """Resolve the MongoDB SRV records for a host, memoized"""
+    return tuple(
+        (str(srv.target), srv.port)
+        for srv in _resolver.resolve(f"_mongodb._tcp.{host}", "SRV")
+    )
+
+
 def test_dns():
     print("Testing DNS resolution for MongoDB Atlas...")
     
@@ -25,11 +42,8 @@ def test_dns():
     try:
         # Try SRV record resolution
         print("\nChecking MongoDB SRV records...")
-        resolver = dns.resolver.Resolver()
-        srv_records = resolver.resolve('_mongodb._tcp.cluster08122.jkmqf6j.mongodb.net', 'SRV')
-        
-        for srv in srv_records:
-            print(f"✓ SRV Record: {srv.target}:{srv.port}")
+        for target, port in _resolve_srv(host):
+            print(f"✓ SRV Record: {target}:{port}")
         
         return True
         
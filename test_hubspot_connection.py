@@ -11,19 +11,24 @@ from hubspot_config import HubSpotConfigManager
 from database import OpportunityDB
 from config_db import MONGODB_CONFIG
 
+# Module-level keep-alive session: repeated calls to api.hubapi.com reuse
+# one TLS connection instead of handshaking per request
+_session = requests.Session()
+
+
 def test_direct_api_call(token):
     """Test direct API call to HubSpot"""
     print("\n1. Testing direct API call...")
-    
+
     # Test with pipelines endpoint (simple GET request)
     url = "https://api.hubapi.com/crm/v3/pipelines/deals"
-    headers = {
+    _session.headers.update({
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json"
-    }
-    
+    })
+
     try:
-        response = requests.get(url, headers=headers)
+        response = _session.get(url)
         print(f"   Status Code: {response.status_code}")
         
         if response.status_code == 200:
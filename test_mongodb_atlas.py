@@ -3,8 +3,8 @@ Test script to verify MongoDB Atlas connection
 """
 
 import sys
-from pymongo import MongoClient
 from config_db import MONGODB_CONFIG
+from database import get_mongo_client
 
 def test_connection():
     """Test MongoDB Atlas connection"""
@@ -14,8 +14,9 @@ def test_connection():
     print(f"Database name: {MONGODB_CONFIG['database_name']}")
     
     try:
-        # Connect to MongoDB Atlas
-        client = MongoClient(MONGODB_CONFIG["connection_string"])
+        # Connect to MongoDB Atlas via the shared process-wide client,
+        # so SRV lookup and the TLS handshake happen once per process
+        client = get_mongo_client(MONGODB_CONFIG["connection_string"])
         
         # Ping the database to verify connection
         client.admin.command('ping')
@@ -42,8 +43,7 @@ def test_connection():
         test_collection.delete_one({"_id": result.inserted_id})
         print("✓ Test document cleaned up")
         
-        # Close connection
-        client.close()
+        # Shared client - closed by database's atexit hook, not here
         print("\n✅ All tests passed! MongoDB Atlas is ready to use.")
         
         return True
@@ -0,0 +1,11 @@
+"""
+WSGI entry point for running the API under a production server
+
+Usage:
+    gunicorn -k gthread -w 4 --threads 16 -b 0.0.0.0:5001 wsgi:app
+"""
+
+from app import app
+
+if __name__ == "__main__":
+    app.run(port=5001, host='127.0.0.1')